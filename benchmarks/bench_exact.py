@@ -0,0 +1,65 @@
+"""
+Compares the time taken to work out distributions in exact mode, with integer
+counts and :py:class:`fractions.Fraction` probabilities, against float mode.
+The shared distribution cache is cleared before every run, so that each one
+works the distribution out from scratch.
+
+Run from the top of the repository with::
+
+    python benchmarks/bench_exact.py
+"""
+
+import timeit
+
+from xdh import _dice
+
+EXPRESSIONS = [
+    ('3d6', lambda: _dice.Dice(3, _dice.Die(6))),
+    ('20d6', lambda: _dice.Dice(20, _dice.Die(6))),
+    ('100d20', lambda: _dice.Dice(100, _dice.Die(20))),
+    (
+        '4d6kh3',
+        lambda: _dice.Dice(4, _dice.Die(6), _dice.keep_highest(3))
+    ),
+    ('d6!', lambda: _dice.Die(6, explode=True)),
+    (
+        '3d6 * 2d8',
+        lambda: _dice.Dice(3, _dice.Die(6)) * _dice.Dice(2, _dice.Die(8))
+    ),
+    ('10d6 % 7', lambda: _dice.Dice(10, _dice.Die(6)) % 7),
+]
+
+
+def cold(build, exact):
+    _dice.DISTRIBUTIONS.clear()
+    return build().distribution(exact)
+
+
+def bench(build, exact, number):
+    return min(timeit.repeat(
+        lambda: cold(build, exact),
+        number=number,
+        repeat=3
+    )) / number
+
+
+def main(number=5):
+    print(' '.join([
+        'expression'.ljust(12),
+        'float (ms)'.rjust(12),
+        'exact (ms)'.rjust(12),
+        'ratio'.rjust(8)
+    ]))
+    for name, build in EXPRESSIONS:
+        inexact = bench(build, False, number)
+        exact = bench(build, True, number)
+        print(' '.join([
+            name.ljust(12),
+            format(inexact * 1000, '.3f').rjust(12),
+            format(exact * 1000, '.3f').rjust(12),
+            format(exact / inexact, '.2f').rjust(8)
+        ]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares the time taken to add up the distributions of many different dice
+one at a time against adding them up in a balanced tree spread over a process
+pool, for a few pool sizes.
+
+The sums are pure Python and hold the global interpreter lock throughout, so
+a thread pool gives no speedup at all, and only a process pool can. Even a
+process pool can only beat the serial sum with more than one core to run on,
+and the number of cores is printed first. On a single core the tree only
+saves the cost of its smaller intermediate sums.
+
+Run from the top of the repository with::
+
+    python benchmarks/bench_parallel.py [workers ...]
+"""
+
+import concurrent.futures
+import os
+import sys
+import timeit
+
+from xdh import _dice
+from xdh import _distribution
+
+TERMS = [_dice.Die(sides) for sides in range(2, 102)]
+
+
+def bench(distributions, workers, number):
+    if workers < 2:
+        return min(timeit.repeat(
+            lambda: _distribution.convolve(*distributions),
+            number=number,
+            repeat=3
+        )) / number
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        return min(timeit.repeat(
+            lambda: _distribution.convolve(
+                *distributions,
+                executor=executor,
+                workers=workers
+            ),
+            number=number,
+            repeat=3
+        )) / number
+
+
+def main(pool_sizes=(1, 2, 4), number=1):
+    distributions = [term.distribution() for term in TERMS]
+    print(''.join(['cores: ', str(os.cpu_count())]))
+    print(''.join([
+        'd2 + d3 + ... + d', str(TERMS[-1].sides),
+        ' (', str(len(TERMS)), ' terms)'
+    ]))
+    print(' '.join([
+        'workers'.ljust(8),
+        'time (s)'.rjust(10),
+        'speedup'.rjust(8)
+    ]))
+    serial = None
+    for workers in pool_sizes:
+        elapsed = bench(distributions, workers, number)
+        if serial is None:
+            serial = elapsed
+
+        print(' '.join([
+            str(workers).ljust(8),
+            format(elapsed, '.3f').rjust(10),
+            format(serial / elapsed, '.2f').rjust(8)
+        ]))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main([int(arg) for arg in sys.argv[1:]])
+
+    else:
+        main()
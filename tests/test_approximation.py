@@ -0,0 +1,50 @@
+"""
+Checks that the error of approximated distributions carries over into the
+distributions built from them.
+"""
+
+import unittest
+
+from xdh import _dice
+from xdh import _distribution
+
+
+class FullMethodErrorTest(unittest.TestCase):
+    def setUp(self):
+        _dice.DISTRIBUTIONS.clear()
+        self.support = _dice.APPROXIMATE_SUPPORT
+        _dice.APPROXIMATE_SUPPORT = 50
+
+    def tearDown(self):
+        _dice.APPROXIMATE_SUPPORT = self.support
+        _dice.DISTRIBUTIONS.clear()
+
+    def test_monotone_parents(self):
+        pool = _dice.Dice(20, _dice.Die(6))
+        error = pool.distribution().error
+        self.assertGreater(error, 0)
+        for expression in [pool // 2, pool + _dice.Die(8), -pool]:
+            self.assertEqual(
+                expression.distribution(method='full').error,
+                error
+            )
+
+    def test_exact_parents(self):
+        pool = _dice.Dice(20, _dice.Die(6))
+        self.assertEqual(
+            (pool // 2).distribution(exact=True, method='full').error,
+            0
+        )
+
+    def test_non_monotone_transform(self):
+        pool = _dice.Dice(20, _dice.Die(6))
+        approximated = pool.distribution()
+        folded = _distribution.transform(
+            approximated,
+            lambda outcome: abs(outcome - 70)
+        )
+        self.assertEqual(folded.error, 2 * approximated.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+"""
+Checks of rolling many expressions together in one batch.
+"""
+
+import unittest
+
+from xdh import _dice
+
+
+class CollidingDie(_dice.Die):
+    def __hash__(self):
+        return 0
+
+
+class RollBatchTest(unittest.TestCase):
+    def test_hash_collisions_are_kept_apart(self):
+        small = CollidingDie(2)
+        large = CollidingDie(20)
+        self.assertEqual(hash(small), hash(large))
+
+        values = _dice.roll_batch([small, large, 3, small], [50, 50, 2, 5])
+        self.assertEqual([len(row) for row in values], [50, 50, 2, 5])
+        self.assertTrue(all(value in {1, 2} for value in values[0]))
+        self.assertTrue(all(1 <= value <= 20 for value in values[1]))
+        self.assertTrue(any(value > 2 for value in values[1]))
+        self.assertEqual(values[2], [3, 3])
+        self.assertTrue(all(value in {1, 2} for value in values[3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+Checks of the in-memory and on-disk distribution caches.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+from xdh import _cache
+from xdh import _dice
+
+
+def value(tag):
+    return bytes([tag]) * 100
+
+
+SIZE = sys.getsizeof(value(0))
+
+
+class CacheTest(unittest.TestCase):
+    def test_lru_order(self):
+        cache = _cache.Cache(3 * SIZE, 'lru')
+        for key in 'abc':
+            cache.put(key, value(ord(key)))
+
+        cache.get('a')
+        cache.put('d', value(ord('d')))
+        self.assertNotIn('b', cache)
+        self.assertEqual(len(cache), 3)
+        cache.put('e', value(ord('e')))
+        self.assertNotIn('c', cache)
+        self.assertIn('a', cache)
+
+    def test_lfu_order(self):
+        cache = _cache.Cache(3 * SIZE, 'lfu')
+        for key in 'abc':
+            cache.put(key, value(ord(key)))
+
+        for key in 'aab':
+            cache.get(key)
+
+        cache.put('d', value(ord('d')))
+        self.assertNotIn('c', cache)
+        self.assertIn('d', cache)
+        cache.put('e', value(ord('e')))
+        self.assertNotIn('d', cache)
+        self.assertEqual(len(cache), 3)
+        for key in 'abe':
+            self.assertIn(key, cache)
+
+    def test_info(self):
+        cache = _cache.Cache(2 * SIZE)
+        cache.put('a', value(1))
+        cache.put('b', value(2))
+        self.assertEqual(cache.get('a'), value(1))
+        self.assertIsNone(cache.get('z'))
+        cache.put('c', value(3))
+        self.assertEqual(
+            cache.info(),
+            _cache.CacheInfo(1, 1, 1, 2, 2 * SIZE, 2 * SIZE)
+        )
+        cache.clear()
+        self.assertEqual(
+            cache.info(),
+            _cache.CacheInfo(1, 1, 1, 0, 0, 2 * SIZE)
+        )
+
+    def test_budget(self):
+        cache = _cache.Cache(3 * SIZE)
+        cache.put('big', bytes(4 * SIZE))
+        self.assertNotIn('big', cache)
+        for key in 'abc':
+            cache.put(key, value(ord(key)))
+
+        cache.budget = SIZE
+        self.assertEqual(len(cache), 1)
+        self.assertIn('c', cache)
+        with self.assertRaises(ValueError):
+            cache.budget = -1
+
+        with self.assertRaises(ValueError):
+            cache.policy = 'fifo'
+
+    def test_distributions_are_shared_by_structure(self):
+        _dice.DISTRIBUTIONS.clear()
+        first = (_dice.Dice(5, _dice.Die(6)) + 2).distribution()
+        hits = _dice.DISTRIBUTIONS.info().hits
+        second = (_dice.Dice(5, _dice.Die(6)) + 2).distribution()
+        self.assertIs(second, first)
+        self.assertGreater(_dice.DISTRIBUTIONS.info().hits, hits)
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = _cache.DiskCache(self.directory.name)
+        self.distribution = _dice.Dice(60, _dice.Die(6)).distribution()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, digest):
+        return os.path.join(self.directory.name, digest + '.dist')
+
+    def test_round_trip(self):
+        self.assertTrue(self.cache.put('pool', self.distribution))
+        found = self.cache.get('pool')
+        self.assertEqual(tuple(found.outcomes), self.distribution.outcomes)
+        self.assertEqual(tuple(found.weights), self.distribution.weights)
+        self.assertEqual(found.error, self.distribution.error)
+
+    def test_small_distributions_are_not_kept(self):
+        self.assertFalse(self.cache.put('die', _dice.Die(6).distribution()))
+        self.assertIsNone(self.cache.get('die'))
+
+    def test_missing_file(self):
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_short_file(self):
+        self.cache.put('pool', self.distribution)
+        with open(self.path('pool'), 'r+b') as file:
+            file.truncate(_cache.STORE_HEADER.size + 8)
+
+        self.assertIsNone(self.cache.get('pool'))
+
+        with open(self.path('pool'), 'wb') as file:
+            file.write(b'XDH')
+
+        self.assertIsNone(self.cache.get('pool'))
+
+    def test_corrupt_header(self):
+        self.cache.put('pool', self.distribution)
+        with open(self.path('pool'), 'r+b') as file:
+            file.write(b'NOTADIST')
+
+        self.assertIsNone(self.cache.get('pool'))
+
+
+class StoredDistributionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        _dice.DISK_CACHE.path = self.directory.name
+        _dice.DISTRIBUTIONS.clear()
+
+    def tearDown(self):
+        _dice.DISK_CACHE.path = None
+        _dice.DISTRIBUTIONS.clear()
+        self.directory.cleanup()
+
+    def test_distributions_are_found_again(self):
+        first = _dice.Dice(60, _dice.Die(6)).distribution()
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+        _dice.DISTRIBUTIONS.clear()
+        second = _dice.Dice(60, _dice.Die(6)).distribution()
+        self.assertIsInstance(second.weights, _cache.Table)
+        self.assertEqual(tuple(second.outcomes), first.outcomes)
+        self.assertEqual(tuple(second.weights), first.weights)
+
+    def test_exact_distributions_are_not_stored(self):
+        _dice.Dice(60, _dice.Die(6)).distribution(exact=True)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+
+class DigestTest(unittest.TestCase):
+    def setUp(self):
+        self.settings = (
+            _dice.ENGINE_VERSION,
+            _dice.EXPLODE_DEPTH,
+            _dice.APPROXIMATE_SUPPORT
+        )
+
+    def tearDown(self):
+        (
+            _dice.ENGINE_VERSION,
+            _dice.EXPLODE_DEPTH,
+            _dice.APPROXIMATE_SUPPORT
+        ) = self.settings
+
+    def test_same_structure_same_digest(self):
+        self.assertEqual(
+            _dice.Dice(60, _dice.Die(6))._digest(),
+            _dice.Dice(60, _dice.Die(6))._digest()
+        )
+
+    def test_settings_change_digest(self):
+        expression = _dice.Dice(60, _dice.Die(6))
+        digests = {expression._digest()}
+        for name in ['ENGINE_VERSION', 'EXPLODE_DEPTH', 'APPROXIMATE_SUPPORT']:
+            setattr(_dice, name, getattr(_dice, name) + 1)
+            digests.add(expression._digest())
+
+        self.assertEqual(len(digests), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Checks of the pairwise win and tie odds given by contest_matrix.
+"""
+
+import concurrent.futures
+import fractions
+import itertools
+import unittest
+
+from xdh import _dice
+
+
+class ContestMatrixTest(unittest.TestCase):
+    def setUp(self):
+        self.expressions = [
+            _dice.Die(6),
+            _dice.Die(8),
+            _dice.Dice(2, _dice.Die(4)),
+            3,
+        ]
+
+    def test_totals(self):
+        wins, ties = _dice.contest_matrix(self.expressions, exact=True)
+        for row, column in itertools.product(range(4), repeat=2):
+            self.assertEqual(ties[row][column], ties[column][row])
+            self.assertEqual(
+                wins[row][column] + wins[column][row] + ties[row][column],
+                1
+            )
+
+        self.assertEqual(wins[0][0], fractions.Fraction(5, 12))
+        self.assertEqual(wins[3][3], 0)
+        self.assertEqual(ties[3][3], 1)
+
+    def test_against_enumeration(self):
+        wins, ties = _dice.contest_matrix(self.expressions[:2], exact=True)
+        pairs = list(itertools.product(range(1, 7), range(1, 9)))
+        self.assertEqual(
+            wins[1][0],
+            fractions.Fraction(sum(b > a for a, b in pairs), len(pairs))
+        )
+        self.assertEqual(
+            ties[0][1],
+            fractions.Fraction(sum(a == b for a, b in pairs), len(pairs))
+        )
+        self.assertEqual(wins[0][1], fractions.Fraction(15, 48))
+
+    def test_executor(self):
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            self.assertEqual(
+                _dice.contest_matrix(
+                    self.expressions,
+                    exact=True,
+                    executor=executor
+                ),
+                _dice.contest_matrix(self.expressions, exact=True)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,306 @@
+"""
+Checks of worked out distributions against brute-force enumeration of every
+way the dice can land.
+"""
+
+import collections
+import fractions
+import itertools
+import unittest
+
+from xdh import _dice
+
+
+def enumerate_exact(func, *sides):
+    """
+    The exact distribution of func applied to the faces of independent dice
+    with the given numbers of sides, found by trying every roll.
+    """
+
+    counts = collections.Counter(
+        func(*faces)
+        for faces in itertools.product(
+            *(range(1, count + 1) for count in sides)
+        )
+    )
+    total = sum(counts.values())
+    return {
+        outcome: fractions.Fraction(count, total)
+        for outcome, count in counts.items()
+    }
+
+
+class SharedPoolTest(unittest.TestCase):
+    def setUp(self):
+        _dice.DISTRIBUTIONS.clear()
+
+    def test_shared_pool_after_smaller_pool(self):
+        shared = _dice.DiceShared(_dice.Die(4))
+        _dice.Dice(2, shared).distribution(exact=True)
+        self.assertEqual(
+            dict(_dice.Dice(3, shared).distribution(exact=True)),
+            enumerate_exact(lambda face: 3 * face, 4)
+        )
+
+    def test_shared_pool_after_pool_in_other_expression(self):
+        shared = _dice.DiceShared(_dice.Die(4))
+        (_dice.Dice(2, shared) + 1).distribution(exact=True)
+        (_dice.Dice(2, shared) * 2).distribution()
+        self.assertEqual(
+            dict((shared + _dice.Dice(2, shared)).distribution(exact=True)),
+            enumerate_exact(lambda face: 3 * face, 4)
+        )
+        self.assertEqual(
+            dict(_dice.Dice(3, shared).distribution(exact=True)),
+            enumerate_exact(lambda face: 3 * face, 4)
+        )
+
+    def test_large_shared_pool_is_not_approximated(self):
+        shared = _dice.DiceShared(_dice.Die(6))
+        distribution = _dice.Dice(30000, shared).distribution()
+        self.assertEqual(distribution.error, 0)
+        self.assertEqual(
+            dict(distribution),
+            {
+                outcome: float(probability)
+                for outcome, probability in enumerate_exact(
+                    lambda face: 30000 * face,
+                    6
+                ).items()
+            }
+        )
+        self.assertEqual(
+            dict((shared + _dice.Dice(29999, shared)).distribution()),
+            dict(distribution)
+        )
+
+    def test_plain_pool_after_smaller_pool(self):
+        _dice.Dice(2, _dice.Die(4)).distribution(exact=True)
+        self.assertEqual(
+            dict(_dice.Dice(3, _dice.Die(4)).distribution(exact=True)),
+            enumerate_exact(lambda a, b, c: a + b + c, 4, 4, 4)
+        )
+
+
+class KeepTest(unittest.TestCase):
+    def setUp(self):
+        _dice.DISTRIBUTIONS.clear()
+
+    def test_conventions(self):
+        for convention, func in [
+            (_dice.keep_highest(3), lambda *faces: sum(sorted(faces)[1:])),
+            (_dice.keep_lowest(2), lambda *faces: sum(sorted(faces)[:2])),
+            (_dice.drop_lowest(1), lambda *faces: sum(sorted(faces)[1:])),
+            (_dice.drop_highest(3), lambda *faces: sorted(faces)[0]),
+        ]:
+            self.assertEqual(
+                dict(
+                    _dice.Dice(4, _dice.Die(6), convention).distribution(
+                        exact=True
+                    )
+                ),
+                enumerate_exact(func, 6, 6, 6, 6)
+            )
+
+    def test_batch_rolls_are_possible(self):
+        expression = _dice.Dice(5, _dice.Die(8), _dice.keep_highest(2))
+        distribution = expression.distribution(exact=True)
+        for value in expression.roll_many(200):
+            self.assertIn(value, distribution)
+
+
+class RerollExplodeTest(unittest.TestCase):
+    def setUp(self):
+        _dice.DISTRIBUTIONS.clear()
+
+    def test_reroll(self):
+        self.assertEqual(
+            dict(_dice.Die(6, reroll=(1, 2)).distribution(exact=True)),
+            enumerate_exact(lambda a, b: b if a in {1, 2} else a, 6, 6)
+        )
+
+    def test_explode(self):
+        def exploded(*faces):
+            total = 0
+            for face in faces:
+                total += face
+                if face != 4:
+                    break
+
+            return total
+
+        self.assertEqual(
+            dict(_dice.Die(4, explode=True, depth=2).distribution(exact=True)),
+            enumerate_exact(exploded, 4, 4, 4)
+        )
+
+    def test_explode_truncated_mass(self):
+        distribution = _dice.Die(6, explode=True).distribution(exact=True)
+        self.assertEqual(
+            distribution.truncated,
+            fractions.Fraction(1, 6 ** (_dice.EXPLODE_DEPTH + 1))
+        )
+
+    def test_explode_after_reroll(self):
+        def exploded(a, b, c):
+            first = b if a == 1 else a
+            if first != 6:
+                return first
+
+            return first + c
+
+        self.assertEqual(
+            dict(
+                _dice.Die(6, explode=True, reroll=(1,), depth=1).distribution(
+                    exact=True
+                )
+            ),
+            enumerate_exact(exploded, 6, 6, 6)
+        )
+
+
+class DicePoolTest(unittest.TestCase):
+    def setUp(self):
+        _dice.DISTRIBUTIONS.clear()
+
+    def test_successes(self):
+        def successes(*faces):
+            return sum(
+                (face >= 8) + (face >= 10) - (face <= 1)
+                for face in faces
+            )
+
+        pool = _dice.DicePool(4, _dice.Die(10), 8, double=10, botch=1)
+        self.assertEqual(
+            dict(pool.distribution(exact=True)),
+            enumerate_exact(successes, 10, 10, 10, 10)
+        )
+
+    def test_plain_target(self):
+        pool = _dice.DicePool(3, _dice.Die(6), 5)
+        self.assertEqual(
+            dict(pool.distribution(exact=True)),
+            enumerate_exact(
+                lambda *faces: sum(face >= 5 for face in faces),
+                6,
+                6,
+                6
+            )
+        )
+
+
+class ModulusTest(unittest.TestCase):
+    def setUp(self):
+        _dice.DISTRIBUTIONS.clear()
+
+    def test_integer_product_modulus(self):
+        expression = (_dice.Die(20) * _dice.Die(6)) % 7
+        self.assertEqual(
+            dict(expression.distribution(exact=True)),
+            enumerate_exact(lambda a, b: a * b % 7, 20, 6)
+        )
+
+    def test_shared_sum_modulus(self):
+        shared = _dice.DiceShared(_dice.Die(6))
+        self.assertEqual(
+            dict(((shared + shared) % 4).distribution(exact=True)),
+            enumerate_exact(lambda face: 2 * face % 4, 6)
+        )
+
+    def test_shared_pool_modulus(self):
+        shared = _dice.DiceShared(_dice.Die(4))
+        self.assertEqual(
+            dict((_dice.Dice(3, shared) % 5).distribution(exact=True)),
+            enumerate_exact(lambda face: 3 * face % 5, 4)
+        )
+
+    def test_shared_product_modulus(self):
+        shared = _dice.DiceShared(_dice.Die(6))
+        self.assertEqual(
+            dict(((shared * shared) % 5).distribution(exact=True)),
+            enumerate_exact(lambda face: face * face % 5, 6)
+        )
+
+    def test_non_integer_product_modulus(self):
+        expression = ((_dice.Die(20) / 2) * (_dice.Die(6) / 2)) % 3
+        self.assertEqual(
+            dict(expression.distribution(exact=True)),
+            enumerate_exact(
+                lambda a, b: (
+                    fractions.Fraction(a, 2) * fractions.Fraction(b, 2) % 3
+                ),
+                20,
+                6
+            )
+        )
+
+
+class BitwiseTest(unittest.TestCase):
+    def setUp(self):
+        _dice.DISTRIBUTIONS.clear()
+
+    def test_and_or_xor(self):
+        for expression, func in [
+            (_dice.Die(6) & _dice.Die(12), lambda a, b: a & b),
+            (_dice.Die(6) | _dice.Die(12), lambda a, b: a | b),
+            (_dice.Die(6) ^ _dice.Die(12), lambda a, b: a ^ b),
+        ]:
+            self.assertEqual(
+                dict(expression.distribution(exact=True)),
+                enumerate_exact(func, 6, 12)
+            )
+
+    def test_scalars(self):
+        for expression, func in [
+            (_dice.Die(12) & 5, lambda a: a & 5),
+            (_dice.Die(12) | 3, lambda a: a | 3),
+            (_dice.Die(12) ^ 6, lambda a: a ^ 6),
+            (_dice.Die(12) & -4, lambda a: a & -4),
+            ((_dice.Die(12) - 6) & 5, lambda a: (a - 6) & 5),
+        ]:
+            self.assertEqual(
+                dict(expression.distribution(exact=True)),
+                enumerate_exact(func, 12)
+            )
+
+    def test_three_way(self):
+        self.assertEqual(
+            dict(
+                (_dice.Die(6) & _dice.Die(8) & _dice.Die(10)).distribution(
+                    exact=True
+                )
+            ),
+            enumerate_exact(lambda a, b, c: a & b & c, 6, 8, 10)
+        )
+        self.assertEqual(
+            dict(
+                (_dice.Die(6) ^ _dice.Die(8) ^ _dice.Die(10)).distribution(
+                    exact=True
+                )
+            ),
+            enumerate_exact(lambda a, b, c: a ^ b ^ c, 6, 8, 10)
+        )
+
+    def test_negative_operands(self):
+        for expression, func in [
+            (
+                (_dice.Die(6) - 10) & (_dice.Die(4) - 10),
+                lambda a, b: (a - 10) & (b - 10)
+            ),
+            (
+                (_dice.Die(6) - 10) | (_dice.Die(4) - 10),
+                lambda a, b: (a - 10) | (b - 10)
+            ),
+            (
+                (_dice.Die(6) - 10) ^ _dice.Die(4),
+                lambda a, b: (a - 10) ^ b
+            ),
+        ]:
+            self.assertEqual(
+                dict(expression.distribution(exact=True)),
+                enumerate_exact(func, 6, 4)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Checks of the adaptive Monte Carlo estimates and where they stop.
+"""
+
+import random
+import unittest
+
+from xdh import _dice
+
+
+class EstimateTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(12345)
+        self.pool = _dice.Dice(10, _dice.Die(6))
+
+    def test_relative_tolerance(self):
+        estimate = self.pool.estimate(rel_tol=0.01)
+        self.assertLessEqual(estimate.error, 0.01 * abs(estimate.value))
+        self.assertLess(estimate.trials, 10 ** 7)
+        self.assertLess(abs(estimate.value - 35), 3 * estimate.error)
+
+    def test_absolute_tolerance(self):
+        estimate = self.pool.estimate(
+            lambda value: value - 35,
+            rel_tol=0,
+            abs_tol=0.25
+        )
+        self.assertLessEqual(estimate.error, 0.25)
+        self.assertLess(abs(estimate.value), 3 * estimate.error)
+
+    def test_tighter_tolerance_takes_more_trials(self):
+        loose = self.pool.estimate(rel_tol=0.02)
+        tight = self.pool.estimate(rel_tol=0.002)
+        self.assertGreater(tight.trials, loose.trials)
+        self.assertLessEqual(tight.error, 0.002 * abs(tight.value))
+
+    def test_max_trials(self):
+        estimate = self.pool.estimate(rel_tol=10 ** -9, max_trials=3000)
+        self.assertEqual(estimate.trials, 3000)
+        self.assertGreater(estimate.error, 10 ** -9 * estimate.value)
+
+    def test_constant_statistic_stops_after_one_chunk(self):
+        estimate = self.pool.estimate(lambda value: 1)
+        self.assertEqual(estimate, (1, 0, _dice.ESTIMATE_CHUNK))
+
+    def test_confidence_range(self):
+        with self.assertRaises(ValueError):
+            self.pool.estimate(confidence=1)
+
+
+class SamplingTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(12345)
+        self.pool = _dice.Dice(3, _dice.Die(6)) + _dice.Die(8)
+
+    def test_modes_are_fair(self):
+        for sampling in ['random', 'antithetic', 'stratified', 'halton']:
+            values = self.pool.roll_many(4000, sampling)
+            self.assertEqual(len(values), 4000)
+            self.assertTrue(all(4 <= value <= 26 for value in values))
+            self.assertLess(abs(sum(values) / len(values) - 15), 0.3)
+
+    def test_spread_modes_settle_faster(self):
+        for sampling in ['antithetic', 'stratified', 'halton']:
+            means = [
+                sum(self.pool.roll_many(200, sampling)) / 200
+                for trial in range(40)
+            ]
+            self.assertLess(max(abs(mean - 15) for mean in means), 0.2)
+
+    def test_antithetic_pairs(self):
+        values = _dice.Die(6).roll_many(1000, 'antithetic')
+        self.assertEqual(sum(values), 3500)
+
+    def test_stratified_faces(self):
+        values = _dice.Die(6).roll_many(600, 'stratified')
+        self.assertEqual(
+            sorted(values),
+            sorted(list(range(1, 7)) * 100)
+        )
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.pool.roll_many(10, 'sobol')
+
+
+if __name__ == '__main__':
+    unittest.main()
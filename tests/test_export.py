@@ -0,0 +1,111 @@
+"""
+Checks of quantiles and of the cumulative distribution tables written by
+export_cdf.
+"""
+
+import array
+import ast
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+from xdh import _dice
+
+
+class UnworkableDie(_dice.Die):
+    def _distribution(self, exact):
+        raise AssertionError('The distribution should not be worked out.')
+
+
+def read_npy(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    length = int.from_bytes(data[8:10], 'little')
+    header = ast.literal_eval(data[10:10 + length].decode('latin1'))
+    values = array.array('d')
+    values.frombytes(data[10 + length:])
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    rows, width = header['shape']
+    return [list(values[row * width:(row + 1) * width]) for row in range(rows)]
+
+
+class QuantileTest(unittest.TestCase):
+    def test_ends(self):
+        expression = _dice.Dice(3, _dice.Die(6)) + 2
+        self.assertEqual(expression.quantile(0), 5)
+        self.assertEqual(expression.quantile(1), 20)
+        self.assertEqual(expression.quantile(0, exact=True), 5)
+        self.assertEqual(expression.quantile(1, exact=True), 20)
+
+    def test_median(self):
+        self.assertEqual(_dice.Die(6).quantile(0.5, exact=True), 3)
+        self.assertEqual(_dice.Die(6).quantile([0.5, 0.51]), [3, 4])
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            _dice.Die(6).quantile(1.5)
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.expressions = [_dice.Die(4), _dice.Die(6) + 2]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def expected(self):
+        return [
+            [outcome] + [
+                expression.cdf(outcome)
+                for expression in self.expressions
+            ]
+            for outcome in range(1, 9)
+        ]
+
+    def test_csv(self):
+        _dice.export_cdf(self.expressions, self.path('cdf.csv'))
+        with open(self.path('cdf.csv'), newline='') as file:
+            rows = list(csv.reader(file))
+
+        self.assertEqual(rows[0], ['outcome', 'd4', 'd6 + 2'])
+        self.assertEqual(
+            [[float(value) for value in row] for row in rows[1:]],
+            self.expected()
+        )
+
+    def test_npy(self):
+        _dice.export_cdf(self.expressions, self.path('cdf.npy'), 'npy')
+        self.assertEqual(read_npy(self.path('cdf.npy')), self.expected())
+
+    def test_unknown_format_is_checked_first(self):
+        with self.assertRaises(ValueError):
+            _dice.export_cdf([UnworkableDie(6)], self.path('cdf.txt'), 'txt')
+
+        self.assertFalse(os.path.exists(self.path('cdf.txt')))
+
+    def test_npy_needs_real_outcomes(self):
+        with self.assertRaises(ValueError):
+            _dice.export_cdf(
+                [divmod(_dice.Die(6), 4)],
+                self.path('cdf.npy'),
+                'npy'
+            )
+
+        _dice.export_cdf([_dice.Die(6) / 4], self.path('cdf.npy'), 'npy')
+        self.assertEqual(
+            [row[0] for row in read_npy(self.path('cdf.npy'))],
+            [0.25, 0.5, 0.75, 1, 1.25, 1.5]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Checks that sums spread over worker pools give the same distributions as
+sums worked out one at a time.
+"""
+
+import concurrent.futures
+import unittest
+
+from xdh import _dice
+from xdh import _distribution
+
+
+class ParallelConvolveTest(unittest.TestCase):
+    def setUp(self):
+        self.work = _distribution.PARALLEL_WORK
+        _distribution.PARALLEL_WORK = 10
+        self.distributions = [
+            _dice.Die(sides).distribution(exact=True)
+            for sides in range(2, 24)
+        ]
+
+    def tearDown(self):
+        _distribution.PARALLEL_WORK = self.work
+
+    def check(self, executor, workers):
+        for modulus in [None, 7]:
+            serial = _distribution.convolve(
+                *self.distributions,
+                modulus=modulus
+            )
+            parallel = _distribution.convolve(
+                *self.distributions,
+                modulus=modulus,
+                executor=executor,
+                workers=workers
+            )
+            self.assertEqual(dict(parallel), dict(serial))
+            self.assertEqual(parallel.total, serial.total)
+
+    def test_threads(self):
+        for workers in [2, 3, 8]:
+            with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+                self.check(executor, workers)
+
+    def test_processes(self):
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            self.check(executor, 2)
+
+    def test_adder_on_worker_pool(self):
+        expression = _dice.DiceAdder(*[
+            _dice.Die(sides)
+            for sides in range(2, 24)
+        ])
+        _dice.DISTRIBUTIONS.clear()
+        serial = expression.distribution(exact=True)
+        workers = _dice.WORKERS
+        _dice.WORKERS = _dice.WorkerPool(3, 'thread')
+        try:
+            _dice.DISTRIBUTIONS.clear()
+            parallel = expression.copy().distribution(exact=True)
+
+        finally:
+            _dice.WORKERS.shutdown()
+            _dice.WORKERS = workers
+            _dice.DISTRIBUTIONS.clear()
+
+        self.assertEqual(dict(parallel), dict(serial))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+Checks of the importance-sampled estimates of rare events.
+"""
+
+import unittest
+
+from xdh import _dice
+
+
+def highest_three(values):
+    return sum(sorted(values)[-3:])
+
+
+class RareEventTest(unittest.TestCase):
+    def test_custom_convention_without_theta(self):
+        expression = _dice.Dice(40, _dice.Die(6), highest_three)
+        estimate = expression.rare_event(18, 2000)
+        self.assertEqual(estimate.trials, 2000)
+        self.assertGreater(estimate.value, 0.5)
+        self.assertLessEqual(estimate.value, 1)
+
+    def test_plain_pool_without_theta(self):
+        expression = _dice.Dice(20, _dice.Die(6))
+        estimate = expression.rare_event(100, 20000)
+        exact = expression.sf(99)
+        self.assertLess(abs(estimate.value - exact), 6 * estimate.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Checks of the incremental totals kept by RollResult as dice are rerolled.
+"""
+
+import random
+import unittest
+
+from xdh import _dice
+
+
+class RollResultTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(2024)
+
+    def check(self, result):
+        faces = list(result)
+        self.assertEqual(result.total, sum(faces))
+        self.assertTrue(all(1 <= face <= result.sides for face in faces))
+        ordered = sorted(faces)
+        for num in range(len(faces) + 1):
+            self.assertEqual(result.keep_lowest(num), sum(ordered[:num]))
+            self.assertEqual(
+                result.keep_highest(num),
+                sum(ordered[len(ordered) - num:])
+            )
+
+        for start in range(0, len(faces), 7):
+            for stop in range(start, len(faces) + 1, 5):
+                self.assertEqual(
+                    result.range_total(start, stop),
+                    sum(faces[start:stop])
+                )
+
+    def test_fixed_faces(self):
+        result = _dice.RollResult(6, [3, 1, 6, 6, 2, 5, 1, 4])
+        self.check(result)
+        self.assertEqual(result.keep_highest(3), 17)
+        self.assertEqual(result.keep_lowest(3), 4)
+
+    def test_rerolls_keep_totals(self):
+        result = _dice.Dice(40, _dice.Die(10)).roll_result()
+        self.assertEqual(len(result), 40)
+        self.check(result)
+        for step in range(30):
+            result.reroll(random.sample(range(40), 5))
+            self.check(result)
+
+    def test_reroll_matching(self):
+        result = _dice.RollResult(6, [1] * 50 + [6] * 50)
+        result.reroll_matching([1])
+        self.check(result)
+        self.assertEqual(list(result)[50:], [6] * 50)
+        self.assertLess(list(result)[:50].count(1), 50)
+
+    def test_reroll_extremes(self):
+        result = _dice.RollResult(20, [1, 2, 3, 18, 19, 20])
+        result.reroll_lowest(0)
+        self.assertEqual(list(result), [1, 2, 3, 18, 19, 20])
+        result.reroll_highest(2)
+        self.check(result)
+        self.assertEqual(list(result)[:4], [1, 2, 3, 18])
+        result.reroll_lowest(2)
+        self.check(result)
+        self.assertEqual(list(result)[2:4], [3, 18])
+
+    def test_only_plain_dice(self):
+        with self.assertRaises(ValueError):
+            _dice.Dice(4, _dice.Die(6, explode=True)).roll_result()
+
+
+if __name__ == '__main__':
+    unittest.main()
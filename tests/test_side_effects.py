@@ -0,0 +1,50 @@
+"""
+Checks that building and printing expressions never rolls any of their dice.
+"""
+
+import unittest
+
+from xdh import _dice
+
+
+class CountingDie(_dice.Die):
+    rolls = 0
+
+    def _roll(self):
+        CountingDie.rolls += 1
+        return super()._roll()
+
+
+class SideEffectTest(unittest.TestCase):
+    def setUp(self):
+        CountingDie.rolls = 0
+
+    def test_modulus_by_rollable(self):
+        expression = _dice.Die(20) % CountingDie(6)
+        str(expression)
+        self.assertEqual(CountingDie.rolls, 0)
+
+    def test_modulus_by_zero(self):
+        with self.assertRaises(ZeroDivisionError):
+            _dice.Die(6) % 0
+
+    def test_adder_merges_dice_by_structure(self):
+        expression = (
+            _dice.Dice(20, _dice.Die(6)) +
+            _dice.Die(6) +
+            _dice.Die(8) +
+            _dice.Die(6)
+        )
+        self.assertEqual(
+            sorted(str(item) for item in expression._group),
+            ['22d6', 'd8']
+        )
+
+    def test_shift_by_rollable(self):
+        self.assertEqual(str(_dice.Die(20) << CountingDie(4)), 'd20 << d4')
+        self.assertEqual(str(_dice.Die(20) >> CountingDie(4)), 'd20 >> d4')
+        self.assertEqual(CountingDie.rolls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Checks that sweep gives the same results as working out each step on its own.
+"""
+
+import fractions
+import unittest
+
+from xdh import _dice
+
+
+def build(num):
+    return _dice.Dice(num, _dice.Die(6)) + _dice.Die(4) + 3
+
+
+def independent(num, exact):
+    _dice.DISTRIBUTIONS.clear()
+    return build(num).distribution(exact)
+
+
+class SweepTest(unittest.TestCase):
+    def setUp(self):
+        _dice.DISTRIBUTIONS.clear()
+
+    def test_probabilities(self):
+        for exact in [False, True]:
+            grid, rows = _dice.sweep(build, range(1, 9), exact=exact)
+            self.assertEqual(list(grid), sorted(set(grid)))
+            for num, row in zip(range(1, 9), rows):
+                found = {
+                    outcome: probability
+                    for outcome, probability in zip(grid, row)
+                    if probability
+                }
+                expected = independent(num, exact)
+                self.assertEqual(found.keys(), expected.keys())
+                for outcome, probability in expected.items():
+                    if exact:
+                        self.assertEqual(found[outcome], probability)
+                    else:
+                        self.assertAlmostEqual(
+                            found[outcome],
+                            probability,
+                            places=12
+                        )
+
+    def test_descending_steps(self):
+        grid, rows = _dice.sweep(build, [6, 4, 5], exact=True)
+        for num, row in zip([6, 4, 5], rows):
+            self.assertEqual(
+                {
+                    outcome: probability
+                    for outcome, probability in zip(grid, row)
+                    if probability
+                },
+                dict(independent(num, True))
+            )
+
+    def test_stats(self):
+        rows = _dice.sweep(
+            build,
+            range(1, 5),
+            ['mean', 'min', 'max', lambda distribution: len(distribution)],
+            exact=True
+        )
+        for num, row in zip(range(1, 5), rows):
+            self.assertEqual(
+                row,
+                [
+                    fractions.Fraction(7 * num + 5 + 6, 2),
+                    num + 4,
+                    6 * num + 7,
+                    5 * num + 4
+                ]
+            )
+
+    def test_unknown_stat(self):
+        with self.assertRaises(ValueError):
+            _dice.sweep(build, [1], ['median'])
+
+
+if __name__ == '__main__':
+    unittest.main()
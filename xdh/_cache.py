@@ -0,0 +1,447 @@
+"""
+Module providing the bounded cache that rollable objects keep their worked out
+distributions in, so that objects with the same structure share them. The
+cache is bounded by an estimate of the memory its values take up, rather than
+by their number, as the distribution of a big pool of dice can take up many
+thousands of times the room of a single die's.
+
+Distributions can also be kept on disk, in files that every process on the
+host maps into memory, so that they are not worked out again each time a
+process starts.
+
+"""
+
+import array
+import collections
+import collections.abc
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+
+from xdh import _distribution
+
+DEFAULT_BUDGET = 64 * 2 ** 20
+
+STORE_SIZE = 256
+
+STORE_MAGIC = b'XDHDIST1'
+
+STORE_HEADER = struct.Struct('<8sccxxxxxxQd')
+
+POLICIES = frozenset({'lru', 'lfu'})
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo',
+    ['hits', 'misses', 'evictions', 'entries', 'size', 'budget']
+)
+
+
+class Cache:
+    """
+    A thread-safe mapping of keys to values, bounded by the total size of the
+    values in bytes, as found by :py:func:`sys.getsizeof`. When a new value
+    takes the total over the budget, values are evicted until it fits again:
+    under the ``'lru'`` policy the least recently used go first, and under the
+    ``'lfu'`` policy the least often used go first, oldest first among equals.
+    A value bigger than the whole budget is never kept.
+
+    The size of a value is measured again every time it is found, as values
+    such as distributions may build more tables on themselves as they are
+    used.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, policy='lru'):
+        self.__lock = threading.RLock()
+        self.__entries = collections.OrderedDict()
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__tick = itertools.count()
+        self.__budget = 0
+        self.__policy = 'lru'
+        self.budget = budget
+        self.policy = policy
+
+    @property
+    def budget(self):
+        """
+        The most bytes that the values in the cache can take up.
+        """
+
+        return self.__budget
+
+    @budget.setter
+    def budget(self, budget):
+        budget = int(budget)
+        if budget < 0:
+            raise ValueError('The cache budget cannot be negative.')
+
+        with self.__lock:
+            self.__budget = budget
+            self.__evict()
+
+    @property
+    def policy(self):
+        """
+        The eviction policy, either ``'lru'`` or ``'lfu'``.
+        """
+
+        return self.__policy
+
+    @policy.setter
+    def policy(self, policy):
+        if policy not in POLICIES:
+            raise ValueError(' '.join(['Unknown cache policy:', repr(policy)]))
+
+        with self.__lock:
+            self.__policy = policy
+            self.__uses = {
+                key: (0, next(self.__tick))
+                for key in self.__entries
+            }
+            self.__heap = [
+                (uses, tick, key)
+                for key, (uses, tick) in self.__uses.items()
+            ]
+
+    @property
+    def size(self):
+        """
+        The bytes taken up by the values in the cache.
+        """
+
+        return self.__size
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def get(self, key, default=None):
+        """
+        Looks up a value, counting a hit or a miss.
+
+        :param key: The key of the value.
+        :param default: What to return if the key is not in the cache.
+
+        :return: The value, or default.
+        """
+
+        with self.__lock:
+            try:
+                value, size = self.__entries[key]
+
+            except KeyError:
+                self.__misses += 1
+                return default
+
+            self.__hits += 1
+            self.__use(key)
+            resized = sys.getsizeof(value)
+            if resized != size:
+                self.__entries[key] = (value, resized)
+                self.__size += resized - size
+                self.__evict()
+
+            return value
+
+    def put(self, key, value):
+        """
+        Keeps a value in the cache, evicting others as needed to make room.
+
+        :param key: The key of the value.
+        :param value: The value to keep.
+
+        :return: The value.
+        """
+
+        size = sys.getsizeof(value)
+        with self.__lock:
+            self.__discard(key)
+            if size > self.__budget:
+                return value
+
+            self.__entries[key] = (value, size)
+            self.__size += size
+            self.__use(key)
+            self.__evict()
+
+        return value
+
+    def discard(self, key):
+        """
+        Removes a value from the cache, if it is there.
+
+        :param key: The key of the value.
+        """
+
+        with self.__lock:
+            self.__discard(key)
+
+    def clear(self):
+        """
+        Removes every value from the cache. The counters are kept.
+        """
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__uses.clear()
+            self.__heap.clear()
+            self.__size = 0
+
+    def info(self):
+        """
+        The counters of the cache.
+
+        :return: A :py:class:`CacheInfo` of the number of hits, misses and
+            evictions so far, the number of values in the cache, the bytes
+            they take up, and the budget.
+        """
+
+        with self.__lock:
+            return CacheInfo(
+                self.__hits,
+                self.__misses,
+                self.__evictions,
+                len(self.__entries),
+                self.__size,
+                self.__budget
+            )
+
+    def __use(self, key):
+        if self.__policy == 'lru':
+            self.__entries.move_to_end(key)
+            return
+
+        uses = self.__uses.get(key, (0, None))[0] + 1
+        self.__uses[key] = (uses, next(self.__tick))
+        heapq.heappush(self.__heap, (uses, self.__uses[key][1], key))
+        if len(self.__heap) > 2 * len(self.__uses) + 64:
+            self.__heap = [
+                (uses, tick, key)
+                for key, (uses, tick) in self.__uses.items()
+            ]
+            heapq.heapify(self.__heap)
+
+    def __victim(self):
+        if self.__policy == 'lru':
+            return next(iter(self.__entries))
+
+        while True:
+            uses, tick, key = heapq.heappop(self.__heap)
+            if self.__uses.get(key) == (uses, tick):
+                return key
+
+    def __discard(self, key):
+        try:
+            value, size = self.__entries.pop(key)
+
+        except KeyError:
+            return
+
+        self.__size -= size
+        self.__uses.pop(key, None)
+
+    def __evict(self):
+        while self.__size > self.__budget and self.__entries:
+            self.__discard(self.__victim())
+            self.__evictions += 1
+
+    def __repr__(self):
+        return ''.join([
+            'Cache(',
+            repr(self.__budget),
+            ', ',
+            repr(self.__policy),
+            ')'
+        ])
+
+
+class Table(collections.abc.Sequence):
+    """
+    A read-only sequence of numbers held in a buffer, such as a view of a
+    memory-mapped file, without copying them. It counts only its own size,
+    not the buffer's, as the pages of a mapped file are shared with every
+    other process that maps it, and it is pickled as a tuple.
+    """
+
+    def __init__(self, view):
+        self.__view = view
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Table(self.__view[index])
+
+        return self.__view[index]
+
+    def __len__(self):
+        return len(self.__view)
+
+    def __iter__(self):
+        return iter(self.__view)
+
+    def __reduce__(self):
+        return (tuple, (tuple(self.__view),))
+
+    def __repr__(self):
+        return ''.join(['Table(', repr(tuple(self.__view)), ')'])
+
+
+class DiskCache:
+    """
+    A cache of float distributions in a directory, one file for each, named
+    by the digest of what they are the distribution of. A distribution found
+    there is mapped into memory read-only rather than read, so every process
+    on the host that uses it shares the same pages. Files are written under a
+    temporary name and then renamed into place, so that many processes can
+    share the directory without ever seeing half of a file.
+
+    Only distributions of plain integers or plain floats, with at least
+    STORE_SIZE outcomes, are kept, as smaller ones are quicker to work out
+    again than to look up.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+
+    @property
+    def path(self):
+        """
+        The directory the files are kept in, or None if the cache is not used.
+        """
+
+        return self.__path
+
+    @path.setter
+    def path(self, path):
+        if path is not None:
+            path = os.fspath(path)
+            os.makedirs(path, exist_ok=True)
+
+        self.__path = path
+
+    def __file(self, digest):
+        return os.path.join(self.__path, ''.join([digest, '.dist']))
+
+    def get(self, digest):
+        """
+        Looks up a distribution.
+
+        :param digest: The digest that the distribution was kept under.
+        :type digest: str
+
+        :return: The :py:class:`Distribution`, or None if it is not there.
+        """
+
+        if self.__path is None or digest is None:
+            return None
+
+        try:
+            with open(self.__file(digest), 'rb') as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        except (OSError, ValueError):
+            return None
+
+        view = memoryview(mapped)
+        if len(view) < STORE_HEADER.size:
+            return None
+
+        magic, typecode, order, count, error = STORE_HEADER.unpack_from(view)
+        middle = STORE_HEADER.size + 8 * count
+        if (
+            magic != STORE_MAGIC or
+            typecode not in {b'q', b'd'} or
+            order != sys.byteorder[0].encode('ascii') or
+            len(view) != middle + 8 * count
+        ):
+            return None
+
+        return _distribution.Distribution.from_tables(
+            Table(view[STORE_HEADER.size:middle].cast(typecode.decode())),
+            Table(view[middle:].cast('d')),
+            1,
+            error
+        )
+
+    def put(self, digest, distribution):
+        """
+        Keeps a distribution, if it is one that can be kept.
+
+        :param digest: The digest to keep the distribution under.
+        :type digest: str
+        :param distribution: The :py:class:`Distribution` to keep.
+
+        :return: True if the distribution was written.
+        """
+
+        if (
+            self.__path is None or
+            digest is None or
+            len(distribution) < STORE_SIZE or
+            distribution.total != 1 or
+            not all(type(weight) is float for weight in distribution.weights)
+        ):
+            return False
+
+        types = {type(outcome) for outcome in distribution.outcomes}
+        if types == {int}:
+            typecode = 'q'
+            if not (
+                -2 ** 63 <= distribution.outcomes[0] and
+                distribution.outcomes[-1] < 2 ** 63
+            ):
+                return False
+
+        elif types == {float}:
+            typecode = 'd'
+
+        else:
+            return False
+
+        outcomes = array.array(typecode, distribution.outcomes)
+        weights = array.array('d', distribution.weights)
+        try:
+            file = tempfile.NamedTemporaryFile(
+                'wb',
+                dir=self.__path,
+                delete=False
+            )
+
+        except OSError:
+            return False
+
+        try:
+            with file:
+                file.write(STORE_HEADER.pack(
+                    STORE_MAGIC,
+                    typecode.encode('ascii'),
+                    sys.byteorder[0].encode('ascii'),
+                    len(distribution),
+                    float(distribution.error)
+                ))
+                outcomes.tofile(file)
+                weights.tofile(file)
+
+            os.replace(file.name, self.__file(digest))
+
+        except OSError:
+            try:
+                os.remove(file.name)
+
+            except OSError:
+                pass
+
+            return False
+
+        return True
+
+    def __repr__(self):
+        return ''.join(['DiskCache(', repr(self.__path), ')'])
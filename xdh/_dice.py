@@ -14,14 +14,39 @@ the operation into objects that process the operation when rolled. So,
 """
 
 import abc
+import array
+import concurrent.futures
+import csv
+import fractions
 import functools
+import hashlib
+import heapq
+import itertools
 import math
 import numbers
 import operator
 import random
+import statistics
+import sys
+import threading
 import collections.abc
 
 from xdh import config
+from xdh import _cache
+from xdh import _distribution
+
+EXPLODE_DEPTH = 20
+
+APPROXIMATE_SUPPORT = 10 ** 5
+
+ESTIMATE_CHUNK = 1000
+
+TILT_LIMIT = 20
+
+ENGINE_VERSION = 1
+
+Estimate = collections.namedtuple('Estimate', ['value', 'error', 'trials'])
+
 
 def standard_die(value):
     return value
@@ -31,6 +56,181 @@ def standard_dice(values):
     return sum(values)
 
 
+class Convention:
+    """
+    Wraps a convention function so that it can also declare faster ways of
+    being applied. Any callable works as a convention, but a plain function can
+    only be applied to one roll at a time, and the exact distribution of a
+    plain dice convention has to be found by trying every possible roll.
+
+    The batch function takes a list of inputs and returns the list of outputs,
+    so a whole batch of rolls is converted in one call. For a Die the inputs
+    are faces, and for Dice they are the rows of values of each roll.
+
+    The transform function takes the distribution of the input and returns the
+    distribution of the output. For a Die it is given the distribution of the
+    faces, and for Dice it is given the distribution of a single die and the
+    number of dice.
+    """
+
+    def __init__(self, func, batch=None, transform=None):
+        self.__func = func
+        self.__batch = batch
+        self.__transform = transform
+
+    @property
+    def batch(self):
+        return self.__batch
+
+    @property
+    def transform(self):
+        return self.__transform
+
+    def __call__(self, value):
+        return self.__func(value)
+
+    def _structure(self):
+        return (type(self), self.__func, self.__batch, self.__transform)
+
+    def __hash__(self):
+        return hash(self._structure())
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Convention) and
+            (self.__func, self.__batch, self.__transform) ==
+            (other.__func, other.__batch, other.__transform)
+        )
+
+    def __repr__(self):
+        return ''.join([
+            'Convention(',
+            getattr(self.__func, '__qualname__', repr(self.__func)),
+            ')'
+        ])
+
+
+def convention_batch(convention, values):
+    batch = getattr(convention, 'batch', None)
+    if batch is None:
+        return [convention(value) for value in values]
+
+    return list(batch(values))
+
+
+class Keep:
+    """
+    Dice convention that only counts some of the dice that were rolled, summing
+    the highest (or lowest) of them. The count is either the number of dice to
+    keep, or with drop set, the number of dice to throw away from the other
+    end, so "4d6, drop the lowest" is ``Dice(4, Die(6), drop_lowest(1))``.
+    """
+
+    def __init__(self, count, highest=True, drop=False):
+        count = int(count)
+        if count < 1:
+            raise ValueError('There must be at least one die to keep or drop.')
+
+        self.__count = count
+        self.__highest = bool(highest)
+        self.__drop = bool(drop)
+
+    @property
+    def count(self):
+        return self.__count
+
+    @property
+    def highest(self):
+        return self.__highest
+
+    @property
+    def drop(self):
+        return self.__drop
+
+    def kept(self, num):
+        if self.drop:
+            return max(num - self.count, 0)
+
+        return min(self.count, num)
+
+    def __call__(self, values):
+        values = sorted(values, reverse=self.highest)
+        return sum(values[:self.kept(len(values))])
+
+    def batch(self, rows):
+        rows = list(rows)
+        if not rows:
+            return []
+
+        num = len(rows[0])
+        kept = self.kept(num)
+        if kept * 4 < num:
+            select = heapq.nlargest if self.highest else heapq.nsmallest
+            return [sum(select(kept, row)) for row in rows]
+
+        return [
+            sum(sorted(row, reverse=self.highest)[:kept])
+            for row in rows
+        ]
+
+    def transform(self, distribution, num):
+        return _distribution.keep(
+            distribution,
+            num,
+            self.kept(num),
+            self.highest
+        )
+
+    def _structure(self):
+        return (type(self), self.count, self.highest, self.drop)
+
+    def __hash__(self):
+        return hash(self._structure())
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Keep) and
+            (self.count, self.highest, self.drop) ==
+            (other.count, other.highest, other.drop)
+        )
+
+    def __str__(self):
+        return ''.join([
+            'd' if self.drop else 'k',
+            'h' if self.highest != self.drop else 'l',
+            str(self.count)
+        ])
+
+    def __repr__(self):
+        return ''.join([
+            {
+                (True, False): 'keep_highest',
+                (False, False): 'keep_lowest',
+                (True, True): 'drop_lowest',
+                (False, True): 'drop_highest',
+            }[(self.highest, self.drop)],
+            '(',
+            repr(self.count),
+            ')'
+        ])
+
+
+def keep_highest(count):
+    return Keep(count, highest=True)
+
+
+def keep_lowest(count):
+    return Keep(count, highest=False)
+
+
+def drop_lowest(count):
+    return Keep(count, highest=True, drop=True)
+
+
+def drop_highest(count):
+    return Keep(count, highest=False, drop=True)
+
+
 class HasConvention:
     def __init__(self, convention):
         self.__convention = convention
@@ -40,9 +240,775 @@ class HasConvention:
         return self.__convention
 
 
-class Parenthesize:
-    def paren_str(self):
-        return ''.join(['(', str(self), ')'])
+class Parenthesize:
+    def paren_str(self):
+        return ''.join(['(', str(self), ')'])
+
+
+class FacePool:
+    """
+    Bulk source of die faces used when rolling in batches. All of the faces
+    needed for a batch are drawn up front with a single call to the random
+    number generator for each distinct number of sides, and then handed out in
+    slices to the dice that need them.
+    """
+
+    def __init__(self, count, demand):
+        self.__count = count
+        self.__faces = {}
+        self.__positions = {}
+        self.__shared = {}
+        for sides, total in demand.items():
+            self.__draw(sides, total)
+
+    @property
+    def count(self):
+        return self.__count
+
+    def __draw(self, sides, total):
+        faces = random.choices(range(1, sides + 1), k=total)
+        position = self.__positions.get(sides, 0)
+        self.__faces[sides] = self.__faces.get(sides, [])[position:] + faces
+        self.__positions[sides] = 0
+
+    def take(self, sides, num):
+        position = self.__positions.get(sides, 0)
+        if len(self.__faces.get(sides, [])) - position < num:
+            self.__draw(sides, num)
+            position = 0
+
+        self.__positions[sides] = position + num
+        return self.__faces[sides][position:position + num]
+
+    def extra(self, sides, num):
+        """
+        Hands out faces for rolls that are not laid out one per trial, like
+        the extra rolls of exploding and rerolled dice. These are always
+        drawn independently, whatever the pool does with the rest.
+        """
+
+        return FacePool.take(self, sides, num)
+
+    def shared(self, node):
+        """
+        The values of a shared node for each trial of the batch, rolled the
+        first time they are asked for and then handed out again.
+        """
+
+        try:
+            return self.__shared[id(node)]
+
+        except KeyError:
+            self.__shared[id(node)] = node.rollable._roll_batch(
+                self.count,
+                self
+            )
+            return self.__shared[id(node)]
+
+
+class FacePoolView(FacePool):
+    """
+    A view of a face pool for rolling part of a batch with its own layout of
+    trials, where trials lists the trial of the underlying pool that each of
+    its trials belongs to. This lets a part be rolled more than once per trial
+    (like the dice of a Dice), or for only some of the trials, while shared
+    nodes still roll the same for everything in a trial. Faces come from the
+    underlying pool's independent draws.
+    """
+
+    def __init__(self, pool, trials):
+        super().__init__(len(trials), collections.Counter())
+        self.__pool = pool
+        self.__trials = trials
+
+    def take(self, sides, num):
+        return self.__pool.extra(sides, num)
+
+    def extra(self, sides, num):
+        return self.__pool.extra(sides, num)
+
+    def shared(self, node):
+        values = self.__pool.shared(node)
+        return [values[trial] for trial in self.__trials]
+
+
+def expanded(faces, count, num):
+    """
+    The face pool for rolling something num times in each of count trials,
+    laid out one trial after another. This is the pool itself, unless shared
+    nodes need to know which trial each roll belongs to.
+    """
+
+    return FacePoolView(
+        faces,
+        [trial for trial in range(count) for i in range(num)]
+    )
+
+
+class DesignedFacePool(FacePool):
+    """
+    Base class for face pools that lay out the faces of a batch by a sampling
+    design, rather than drawing each face independently, so that estimates
+    made from the batch need fewer trials for the same precision.
+
+    Every die slot in a batch takes a column of faces, one for each trial,
+    and a die that is rolled several times per trial takes its columns
+    interleaved one trial after another. So each column is made by the design
+    and then the columns are interleaved. Each trial on its own still rolls
+    every face with the same chance, so the designs do not bias anything
+    estimated from the batch. Any take that is not a whole number of trials,
+    like the extra rolls of exploding dice, is drawn independently.
+    """
+
+    def __init__(self, count, demand):
+        super().__init__(count, collections.Counter())
+
+    def take(self, sides, num):
+        count = self.count
+        if not count or num % count:
+            return super().take(sides, num)
+
+        columns = [self._column(sides, count) for i in range(num // count)]
+        return [face for faces in zip(*columns) for face in faces]
+
+    def _column(self, sides, count):
+        raise NotImplementedError
+
+
+class AntitheticFacePool(DesignedFacePool):
+    """
+    Face pool that pairs each trial in the first half of a batch with one in
+    the second half that rolls the mirror image face (sides + 1 - face) on
+    every die, so that high and low rolls balance each other out.
+    """
+
+    def _column(self, sides, count):
+        half = count // 2
+        faces = random.choices(range(1, sides + 1), k=count - half)
+        return faces + [sides + 1 - face for face in faces[:half]]
+
+
+class StratifiedFacePool(DesignedFacePool):
+    """
+    Face pool where each die slot rolls every face the same number of times
+    over the batch (as near as the batch size allows), in a random order.
+    Shuffling each slot separately makes this a Latin hypercube design across
+    the dice of a trial.
+    """
+
+    def _column(self, sides, count):
+        faces = list(range(1, sides + 1)) * (count // sides)
+        faces.extend(random.sample(range(1, sides + 1), count % sides))
+        random.shuffle(faces)
+        return faces
+
+
+class HaltonFacePool(DesignedFacePool):
+    """
+    Face pool that maps a low-discrepancy Halton sequence onto the faces, with
+    the next prime base for each die slot the pool hands out. Every sequence
+    is moved by a random shift (wrapping around), which keeps each trial
+    uniform while keeping the even spread of the sequence.
+    """
+
+    def __init__(self, count, demand):
+        super().__init__(count, demand)
+        self.__bases = []
+
+    def __base(self):
+        candidate = self.__bases[-1] + 1 if self.__bases else 2
+        while any(candidate % base == 0 for base in self.__bases):
+            candidate += 1
+
+        self.__bases.append(candidate)
+        return candidate
+
+    def _column(self, sides, count):
+        base = self.__base()
+        shift = random.random()
+        return [
+            min(
+                int((radical_inverse(index, base) + shift) % 1 * sides),
+                sides - 1
+            ) + 1
+            for index in range(1, count + 1)
+        ]
+
+
+def radical_inverse(index, base):
+    ret = 0
+    scale = 1 / base
+    while index:
+        index, digit = divmod(index, base)
+        ret += digit * scale
+        scale /= base
+
+    return ret
+
+
+class TiltedFacePool(FacePool):
+    """
+    Face pool for importance sampling, which rolls each face of a die with a
+    chance proportional to ``exp(theta * face)`` rather than evenly, pushing
+    the rolls towards high faces for a positive theta and low faces for a
+    negative one. For each trial it keeps the log of the likelihood ratio of
+    its faces, the chance of rolling them on fair dice over the chance of
+    rolling them on the tilted dice, which is what each trial has to be
+    weighted by to undo the tilt. The extra rolls of exploding and rerolled
+    dice are not tilted.
+    """
+
+    def __init__(self, count, demand, theta):
+        super().__init__(count, collections.Counter())
+        self.__theta = theta
+        self.__tilts = {}
+        self.__log_ratios = [0.0] * count
+
+    @property
+    def theta(self):
+        return self.__theta
+
+    @property
+    def log_ratios(self):
+        return self.__log_ratios
+
+    def __tilt(self, sides):
+        try:
+            return self.__tilts[sides]
+
+        except KeyError:
+            pass
+
+        exponents = [self.__theta * face for face in range(1, sides + 1)]
+        top = max(exponents)
+        weights = [math.exp(exponent - top) for exponent in exponents]
+        self.__tilts[sides] = (
+            weights,
+            top + math.log(math.fsum(weights)) - math.log(sides)
+        )
+        return self.__tilts[sides]
+
+    def take(self, sides, num):
+        count = self.count
+        if not count or num % count:
+            return self.extra(sides, num)
+
+        weights, offset = self.__tilt(sides)
+        faces = random.choices(range(1, sides + 1), weights, k=num)
+        stride = num // count
+        ratios = self.__log_ratios
+        for index, face in enumerate(faces):
+            ratios[index // stride] += offset - self.__theta * face
+
+        return faces
+
+
+def tilted_mean(sides, theta):
+    exponents = [theta * face for face in range(1, sides + 1)]
+    top = max(exponents)
+    weights = [math.exp(exponent - top) for exponent in exponents]
+    return math.fsum(
+        face * weight
+        for face, weight in zip(range(1, sides + 1), weights)
+    ) / math.fsum(weights)
+
+
+def solve_tilt(per_trial, target):
+    """
+    Finds the tilt that makes the expected total of the faces of a trial equal
+    the target, where per_trial maps each number of sides to how many of those
+    dice a trial rolls. The expected total under a tilt is the derivative of
+    the log of the moment generating function of the faces, which only grows
+    with the tilt, so it is found by bisection.
+    """
+
+    def mean(theta):
+        return math.fsum(
+            num * tilted_mean(sides, theta)
+            for sides, num in per_trial.items()
+        )
+
+    low = -TILT_LIMIT
+    high = TILT_LIMIT
+    for i in range(100):
+        middle = (low + high) / 2
+        if mean(middle) < target:
+            low = middle
+        else:
+            high = middle
+
+    return (low + high) / 2
+
+
+FACE_POOLS = {
+    'random': FacePool,
+    'antithetic': AntitheticFacePool,
+    'stratified': StratifiedFacePool,
+    'halton': HaltonFacePool,
+}
+
+
+def face_pool(sampling, count, demand):
+    try:
+        pool = FACE_POOLS[sampling]
+
+    except KeyError:
+        raise ValueError(' '.join(['Unknown sampling mode:', repr(sampling)]))
+
+    return pool(count, demand)
+
+
+def demand_of(item, count, demand):
+    if isinstance(item, Rollable):
+        item._demand(count, demand)
+
+
+def batch_of(item, count, faces):
+    if isinstance(item, Rollable):
+        return item._roll_batch(count, faces)
+
+    return [item] * count
+
+
+def rollables_of(*items):
+    return tuple(item for item in items if isinstance(item, Rollable))
+
+
+def structure_of(*items):
+    return tuple(
+        item._key() if isinstance(item, Rollable) else (type(item), item)
+        for item in items
+    )
+
+
+def cached_distribution(structure, exact, method='full'):
+    if ROLL_SCOPE.fixed:
+        return None
+
+    return DISTRIBUTIONS.get((structure, exact, method))
+
+
+def stored_distribution(item):
+    if DISK_CACHE.path is None:
+        return None
+
+    return DISK_CACHE.get(item._digest())
+
+
+def store_distribution(item, distribution):
+    if DISK_CACHE.path is not None:
+        DISK_CACHE.put(item._digest(), distribution)
+
+
+def encode_value(value):
+    if value is None or type(value) in {bool, int, float, complex, str}:
+        return ''.join([type(value).__name__, '(', repr(value), ')'])
+
+    if isinstance(value, fractions.Fraction):
+        return repr(value)
+
+    if isinstance(value, (set, frozenset)):
+        return ''.join(['{', ','.join(sorted(map(encode_value, value))), '}'])
+
+    if isinstance(value, tuple):
+        return ''.join(['(', ','.join(map(encode_value, value)), ')'])
+
+    if hasattr(value, '_structure') and not isinstance(value, type):
+        return encode_value(value._structure())
+
+    qualname = getattr(value, '__qualname__', None)
+    module = getattr(value, '__module__', None)
+    if qualname is None or module is None or '<' in qualname:
+        raise ValueError(
+            ' '.join(['No stable name is available for', repr(value)])
+        )
+
+    return '.'.join([module, qualname])
+
+
+def digest_of(structure):
+    """
+    A digest of the structure of a rollable object that is the same in every
+    process, unlike its hash, which changes from run to run. Functions and
+    classes are named by where they are defined, and shared nodes are numbered
+    in the order they first appear. If anything in the structure cannot be
+    named this way, such as a lambda, there is no digest.
+
+    The digest also covers the settings that the distribution was worked out
+    under, given by :py:func:`digest_settings`, so that a distribution kept
+    by an older engine, or under other settings, is never found again.
+
+    :param structure: The structure, as given by the object's ``_key()``.
+    :type structure: tuple
+
+    :return: The digest as a hex string, or None.
+    """
+
+    shared = {}
+
+    def encode(part):
+        if isinstance(part[0], type):
+            return encode_value(part[1])
+
+        if part[0][1] is DiceShared:
+            token = shared.setdefault(id(part[1][1]), len(shared))
+            return ''.join(['shared', str(token), encode(part[2])])
+
+        return ''.join(['(', ','.join(map(encode, part)), ')'])
+
+    try:
+        encoded = encode(structure)
+
+    except ValueError:
+        return None
+
+    return hashlib.sha256(
+        _cache.STORE_MAGIC +
+        repr(digest_settings()).encode('utf-8') +
+        encoded.encode('utf-8')
+    ).hexdigest()
+
+
+def digest_settings():
+    return ENGINE_VERSION, EXPLODE_DEPTH, APPROXIMATE_SUPPORT
+
+
+def distribution_of(item, exact=False):
+    if isinstance(item, Rollable):
+        return item.distribution(exact)
+
+    return _distribution.point(item)
+
+
+def distribution_mod(item, modulus, exact=False):
+    if isinstance(item, Rollable):
+        return item._distribution_mod(modulus, exact)
+
+    return _distribution.point(item % modulus)
+
+
+class RollScope(threading.local):
+    """
+    The state of the roll in progress in each thread: the values that shared
+    nodes have rolled so far (when rolling one at a time), and the values that
+    shared nodes are fixed to (when working out a distribution conditioned on
+    them).
+    """
+
+    memo = None
+    fixed = None
+
+
+ROLL_SCOPE = RollScope()
+
+DISTRIBUTIONS = _cache.Cache()
+
+DISK_CACHE = _cache.DiskCache()
+
+
+class WorkerPool:
+    """
+    The pool of workers that big sums of distributions are spread over. It is
+    only started the first time it is needed, and with fewer than two workers
+    the sums are worked out where they are asked for. Process workers get
+    around the global interpreter lock, which the sums never let go of, at
+    the cost of sending the distributions to them. The sums are pure Python,
+    so thread workers never make them any faster, and only help when other
+    threads are waiting on something else. Only process workers, on a host
+    with more than one core, can speed the sums up.
+    """
+
+    def __init__(self, size=0, kind='process'):
+        self.__lock = threading.Lock()
+        self.__executor = None
+        self.size = size
+        self.kind = kind
+
+    @property
+    def size(self):
+        return self.__size
+
+    @size.setter
+    def size(self, size):
+        size = int(size)
+        if size < 0:
+            raise ValueError('The pool size cannot be negative.')
+
+        self.shutdown()
+        self.__size = size
+
+    @property
+    def kind(self):
+        return self.__kind
+
+    @kind.setter
+    def kind(self, kind):
+        if kind not in WORKER_POOLS:
+            raise ValueError(' '.join(['Unknown pool type:', repr(kind)]))
+
+        self.shutdown()
+        self.__kind = kind
+
+    @property
+    def executor(self):
+        """
+        The :py:class:`concurrent.futures.Executor` of the pool, or None if
+        there are fewer than two workers.
+        """
+
+        if self.__size < 2:
+            return None
+
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = WORKER_POOLS[self.__kind](self.__size)
+
+            return self.__executor
+
+    def shutdown(self):
+        """
+        Stops the workers. The pool starts again the next time it is needed.
+        """
+
+        with self.__lock:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+                self.__executor = None
+
+
+WORKER_POOLS = {
+    'process': concurrent.futures.ProcessPoolExecutor,
+    'thread': concurrent.futures.ThreadPoolExecutor,
+}
+
+WORKERS = WorkerPool()
+
+
+class Fenwick:
+    """
+    A Fenwick (binary indexed) tree over a list of numbers, which changes
+    single entries and sums the leading entries in O(log n) time.
+    """
+
+    def __init__(self, values):
+        tree = [0]
+        tree.extend(values)
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+
+        self.__tree = tree
+
+    def __len__(self):
+        return len(self.__tree) - 1
+
+    def add(self, index, delta):
+        tree = self.__tree
+        index += 1
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    def prefix(self, stop):
+        """
+        The sum of the first stop entries.
+        """
+
+        tree = self.__tree
+        ret = 0
+        while stop > 0:
+            ret += tree[stop]
+            stop -= stop & -stop
+
+        return ret
+
+    def search(self, target):
+        """
+        The most leading entries that sum to no more than the target, for a
+        tree with no negative entries.
+        """
+
+        tree = self.__tree
+        position = 0
+        step = 1 << (len(self).bit_length() - 1) if len(self) else 0
+        while step:
+            if position + step <= len(self) and tree[position + step] <= target:
+                position += step
+                target -= tree[position]
+
+            step >>= 1
+
+        return position
+
+
+class RollResult(collections.abc.Sequence):
+    """
+    The individual dice of a roll of many dice, kept so that some of them can
+    be rerolled without rolling and adding up the rest again. The faces are
+    kept in a compact array, with a Fenwick tree over them for the total of
+    any run of dice, and Fenwick trees over how many dice show each face (and
+    their total), which answer keep highest and keep lowest in O(log sides).
+    Rerolling k dice costs O(k log n).
+    """
+
+    def __init__(self, sides, faces):
+        self.__sides = sides
+        typecode = 'B' if sides < 1 << 8 else 'H' if sides < 1 << 16 else 'L'
+        self.__faces = array.array(typecode, faces)
+        self.__total = sum(self.__faces)
+        self.__sums = Fenwick(self.__faces)
+
+        counts = [0] * sides
+        self.__positions = [set() for face in range(sides)]
+        for index, face in enumerate(self.__faces):
+            counts[face - 1] += 1
+            self.__positions[face - 1].add(index)
+
+        self.__counts = Fenwick(counts)
+        self.__face_sums = Fenwick(
+            count * face
+            for face, count in enumerate(counts, 1)
+        )
+
+    @property
+    def sides(self):
+        return self.__sides
+
+    @property
+    def total(self):
+        return self.__total
+
+    def __getitem__(self, index):
+        return self.__faces[index]
+
+    def __len__(self):
+        return len(self.__faces)
+
+    def range_total(self, start, stop):
+        """
+        The total of the dice from start up to (but not including) stop.
+        """
+
+        return self.__sums.prefix(stop) - self.__sums.prefix(start)
+
+    def __set(self, index, face):
+        old = self.__faces[index]
+        if face == old:
+            return
+
+        self.__faces[index] = face
+        self.__total += face - old
+        self.__sums.add(index, face - old)
+        self.__counts.add(old - 1, -1)
+        self.__counts.add(face - 1, 1)
+        self.__face_sums.add(old - 1, -old)
+        self.__face_sums.add(face - 1, face)
+        self.__positions[old - 1].discard(index)
+        self.__positions[face - 1].add(index)
+
+    def reroll(self, indices):
+        """
+        Rerolls the dice at the given positions.
+
+        :param indices: The positions of the dice to reroll.
+        :type indices: iterable
+
+        :return: This roll result, to allow chaining.
+        """
+
+        indices = list(indices)
+        faces = random.choices(range(1, self.sides + 1), k=len(indices))
+        for index, face in zip(indices, faces):
+            self.__set(index, face)
+
+        return self
+
+    def reroll_matching(self, faces):
+        """
+        Rerolls, once, every die that shows one of the given faces, like
+        rerolling any 1s.
+
+        :param faces: The faces to reroll.
+        :type faces: iterable
+
+        :return: This roll result, to allow chaining.
+        """
+
+        return self.reroll([
+            index
+            for face in set(faces)
+            if 1 <= face <= self.sides
+            for index in self.__positions[face - 1]
+        ])
+
+    def __extreme(self, num, highest):
+        indices = []
+        faces = range(1, self.sides + 1)
+        if highest:
+            faces = reversed(faces)
+
+        for face in faces:
+            if len(indices) >= num:
+                break
+
+            indices.extend(itertools.islice(
+                self.__positions[face - 1],
+                num - len(indices)
+            ))
+
+        return indices
+
+    def reroll_lowest(self, num):
+        """
+        Rerolls the num dice showing the lowest faces.
+
+        :return: This roll result, to allow chaining.
+        """
+
+        return self.reroll(self.__extreme(num, False))
+
+    def reroll_highest(self, num):
+        """
+        Rerolls the num dice showing the highest faces.
+
+        :return: This roll result, to allow chaining.
+        """
+
+        return self.reroll(self.__extreme(num, True))
+
+    def __lowest_total(self, num):
+        if num <= 0:
+            return 0
+
+        if num >= len(self):
+            return self.total
+
+        faces = self.__counts.search(num)
+        below = self.__counts.prefix(faces)
+        return self.__face_sums.prefix(faces) + (num - below) * (faces + 1)
+
+    def keep_lowest(self, num):
+        """
+        The total of the num dice showing the lowest faces.
+        """
+
+        return self.__lowest_total(num)
+
+    def keep_highest(self, num):
+        """
+        The total of the num dice showing the highest faces.
+        """
+
+        return self.total - self.__lowest_total(len(self) - num)
+
+    def __repr__(self):
+        return ''.join([
+            'RollResult(',
+            ', '.join([repr(self.sides), repr(list(self.__faces))]),
+            ')'
+        ])
+
 
 class Rollable(
     collections.abc.Hashable,
@@ -72,9 +1038,562 @@ class Rollable(
             return self()
 
     def __call__(self):
-        self.__last = self._roll()
+        if ROLL_SCOPE.memo is None:
+            ROLL_SCOPE.memo = {}
+            try:
+                self.__last = self._roll()
+
+            finally:
+                ROLL_SCOPE.memo = None
+
+        else:
+            self.__last = self._roll()
+
         return self.last
 
+    def roll_many(self, count, sampling='random'):
+        """
+        Rolls the object a number of times in one batch, rather than walking
+        the object once per roll.
+
+        :param count: The number of rolls to make.
+        :type count: int
+        :param sampling: How the faces of the batch are chosen. ``'random'``
+            rolls every die independently. The others spread the faces more
+            evenly over the batch, so that averages over the rolls settle down
+            faster, while each roll on its own is still fair: ``'antithetic'``
+            pairs each roll with one that rolls the opposite face on every
+            die, ``'stratified'`` rolls each face of each die equally often in
+            a random order, and ``'halton'`` uses a randomly shifted Halton
+            sequence. The rolls are not independent of each other in those
+            modes.
+        :type sampling: str
+
+        :return: A list of the rolled values, in the order they were rolled.
+        """
+
+        count = int(count)
+        demand = collections.Counter()
+        self._demand(count, demand)
+        return self._roll_batch(count, face_pool(sampling, count, demand))
+
+    def _demand(self, count, demand):
+        pass
+
+    def _roll_batch(self, count, faces):
+        return [self() for i in range(count)]
+
+    def distribution(self, exact=False, method='auto'):
+        """
+        The exact probability distribution of the outcomes of this object. It
+        is computed the first time it is asked for, and then remembered.
+
+        Sums of very many dice can instead be approximated from their
+        cumulants, which costs next to nothing however many dice there are.
+        The approximation's :py:attr:`Distribution.error` gives a bound on how
+        far off its cumulative probabilities can be.
+
+        :param exact: If True, the distribution is worked out in integer counts
+            out of the number of ways the dice can land, and its probabilities
+            are given as :py:class:`fractions.Fraction` rather than floats.
+        :type exact: bool
+        :param method: How to work out the distribution. ``'full'`` computes
+            it outcome by outcome. ``'normal'`` approximates it with a normal
+            distribution, and ``'edgeworth'`` adds corrections for skewness
+            and kurtosis to that. ``'auto'``, the default, uses ``'edgeworth'``
+            when the object could roll more than APPROXIMATE_SUPPORT different
+            values and can be approximated, and ``'full'`` otherwise. Only
+            ``'full'`` can be exact. The pieces of this object are still
+            worked out with ``'auto'``, and the error of any of them that are
+            approximated carries over into the error of the whole.
+        :type method: str
+
+        :return: A :py:class:`Distribution` mapping each possible outcome to its
+            probability.
+        """
+
+        exact = bool(exact)
+        if method == 'auto':
+            method = 'full'
+            if not exact:
+                lattice = self._lattice()
+                if lattice is not None and (
+                    (lattice[1] - lattice[0]) // lattice[2] + 1 >
+                    APPROXIMATE_SUPPORT
+                ):
+                    method = 'edgeworth'
+
+        elif method not in {'full', 'normal', 'edgeworth'}:
+            raise ValueError(
+                ' '.join(['Unknown distribution method:', repr(method)])
+            )
+
+        elif exact and method != 'full':
+            raise ValueError('Approximate distributions cannot be exact.')
+
+        if method == 'full':
+            fixed = ROLL_SCOPE.fixed
+            if fixed and any(key in fixed for key in self._shared_nodes()):
+                return self.__conditioned(exact)
+
+        try:
+            distributions = self.__distributions
+
+        except AttributeError:
+            distributions = self.__distributions = {}
+
+        key = (exact, method)
+        try:
+            return distributions[key]
+
+        except KeyError:
+            pass
+
+        cached = cached_distribution(self._key(), exact, method)
+        if cached is None and method == 'full' and not exact:
+            cached = stored_distribution(self)
+
+        if cached is not None:
+            distributions[key] = cached
+
+        elif method == 'full':
+            distributions[key] = self.__conditioned(exact)
+            if not exact:
+                store_distribution(self, distributions[key])
+
+        else:
+            lattice = self._lattice()
+            if lattice is None:
+                raise ValueError(' '.join([
+                    'Only integer rolls of independent dice can be',
+                    'approximated:',
+                    repr(self)
+                ]))
+
+            distributions[key] = _distribution.approximate(
+                self._cumulants(),
+                lattice,
+                method == 'edgeworth'
+            )
+
+        DISTRIBUTIONS.put((self._key(), exact, method), distributions[key])
+        return distributions[key]
+
+    def __conditioned(self, exact):
+        shared = self._shared_nodes()
+        if not shared:
+            return self._distribution(exact)
+
+        fixed = ROLL_SCOPE.fixed or {}
+        counts = collections.Counter(
+            key
+            for child in self._children()
+            for key in child._shared_nodes()
+        )
+        for key, count in counts.items():
+            if count < 2 or key in fixed:
+                continue
+
+            values = shared[key].rollable.distribution(exact)
+            parts = []
+            for value in values.outcomes:
+                ROLL_SCOPE.fixed = dict(fixed)
+                ROLL_SCOPE.fixed[key] = value
+                try:
+                    parts.append(self.__conditioned(exact))
+
+                finally:
+                    ROLL_SCOPE.fixed = fixed or None
+
+            return _distribution.mixture(values, parts)
+
+        return self._distribution(exact)
+
+    def _children(self):
+        return ()
+
+    def _shared_nodes(self):
+        try:
+            return self.__shared_nodes
+
+        except AttributeError:
+            self.__shared_nodes = {}
+            for child in self._children():
+                self.__shared_nodes.update(child._shared_nodes())
+
+            return self.__shared_nodes
+
+    def _structure(self):
+        return structure_of(type(self), object())
+
+    def _key(self):
+        try:
+            return self.__key
+
+        except AttributeError:
+            self.__key = self._structure()
+            return self.__key
+
+    def _digest(self):
+        settings = digest_settings()
+        try:
+            if self.__digest[0] == settings:
+                return self.__digest[1]
+
+        except AttributeError:
+            pass
+
+        self.__digest = (settings, digest_of(self._key()))
+        return self.__digest[1]
+
+    def _cumulants(self):
+        return _distribution.cumulants(self.distribution(method='full'))
+
+    def _lattice(self):
+        return _distribution.lattice(self.distribution(method='full'))
+
+    def _distribution(self, exact):
+        raise NotImplementedError(
+            ' '.join(['No exact distribution is available for', repr(self)])
+        )
+
+    def _distribution_mod(self, modulus, exact=False):
+        return _distribution.transform(
+            self.distribution(exact),
+            lambda value: value % modulus
+        )
+
+    def sample(self, count):
+        """
+        Draws from the exact distribution of this object rather than rolling
+        it, which costs the same no matter how many dice the object is made
+        of, once the distribution is known.
+
+        :param count: The number of values to draw.
+        :type count: int
+
+        :return: A list of the drawn values.
+        """
+
+        return self.distribution().sample(count)
+
+    def estimate(
+        self,
+        stat=None,
+        rel_tol=0.01,
+        confidence=0.95,
+        *,
+        abs_tol=0,
+        max_trials=10 ** 7,
+        sampling='random'
+    ):
+        """
+        Estimates the expected value of a statistic of the roll of this object
+        by rolling it, for when the exact distribution is out of reach. The
+        rolls are made in batches that double in size each time, with the
+        running mean and variance kept up to date one roll at a time by
+        Welford's method, and rolling stops as soon as the confidence interval
+        around the mean is narrow enough.
+
+        :param stat: A function of a rolled value, such as
+            ``lambda value: value >= 15`` to estimate a probability. If not
+            given, the rolled value itself is used.
+        :type stat: callable
+        :param rel_tol: The largest half-width of the confidence interval to
+            accept, relative to the size of the estimate.
+        :type rel_tol: float
+        :param confidence: The confidence level of the interval.
+        :type confidence: float
+        :param abs_tol: The half-width to accept regardless of the size of the
+            estimate, for statistics that might have an expected value of 0.
+        :type abs_tol: float
+        :param max_trials: The most rolls to make before giving up on the
+            tolerance and returning the estimate as it stands.
+        :type max_trials: int
+        :param sampling: The sampling mode of each batch, as for
+            :py:meth:`roll_many`. The confidence interval is worked out as if
+            the rolls were independent, so under the other modes it is only
+            approximate: it is usually too wide, but it can be too narrow,
+            such as under ``'antithetic'`` for a statistic that is highest or
+            lowest in the middle of the range, and the tolerance may then not
+            really be met.
+        :type sampling: str
+
+        :return: An Estimate named tuple of the estimated value, the
+            half-width of its confidence interval, and the number of trials
+            rolled.
+        """
+
+        if not 0 < confidence < 1:
+            raise ValueError('The confidence must be between 0 and 1.')
+
+        z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+        trials = 0
+        mean = 0
+        squares = 0
+        error = math.inf
+        chunk = ESTIMATE_CHUNK
+        while trials < max_trials:
+            values = self.roll_many(
+                min(chunk, max_trials - trials),
+                sampling
+            )
+            if stat is not None:
+                values = map(stat, values)
+
+            for value in values:
+                trials += 1
+                delta = value - mean
+                mean += delta / trials
+                squares += delta * (value - mean)
+
+            if trials > 1:
+                error = z * math.sqrt(squares / (trials - 1) / trials)
+
+            if error <= max(rel_tol * abs(mean), abs_tol):
+                break
+
+            chunk *= 2
+
+        return Estimate(mean, error, trials)
+
+    def cdf(self, thresholds, exact=False):
+        """
+        The probability of rolling no more than the threshold.
+
+        :param thresholds: The threshold, or an iterable of thresholds.
+        :param exact: If True, the probabilities are given as
+            :py:class:`fractions.Fraction`.
+        :type exact: bool
+
+        :return: The probability, or a list of the probabilities for each of
+            the thresholds.
+        """
+
+        return self.distribution(exact).cdf(thresholds)
+
+    def sf(self, thresholds, exact=False):
+        """
+        The probability of rolling more than the threshold.
+
+        :param thresholds: The threshold, or an iterable of thresholds.
+        :param exact: If True, the probabilities are given as
+            :py:class:`fractions.Fraction`.
+        :type exact: bool
+
+        :return: The probability, or a list of the probabilities for each of
+            the thresholds.
+        """
+
+        return self.distribution(exact).sf(thresholds)
+
+    def quantile(self, probabilities, exact=False):
+        """
+        The lowest value that this object rolls at or below with at least the
+        given probability, such as 0.5 for the median.
+
+        :param probabilities: The probability, or an iterable of probabilities,
+            each between 0 and 1.
+        :param exact: If True, the search is done on exact counts.
+        :type exact: bool
+
+        :return: The quantile, or a list of the quantiles for each of the
+            probabilities.
+        """
+
+        return self.distribution(exact).quantile(probabilities)
+
+    def expect(self, func, vectorized=False, exact=False):
+        """
+        The expected value of a function of the roll of this object, such as
+        damage after a cap or a lookup table, worked out from the exact
+        distribution rather than by rolling.
+
+        :param func: The function to apply to each possible outcome.
+        :type func: callable
+        :param vectorized: If True, func is called only once, with a tuple of
+            every possible outcome, and must return a sequence of the results
+            in the same order.
+        :type vectorized: bool
+        :param exact: If True, the probabilities are worked out as
+            :py:class:`fractions.Fraction`, so that the result is exact when
+            func gives rational values.
+        :type exact: bool
+
+        :return: The expected value.
+        """
+
+        return self.distribution(exact).expect(func, vectorized)
+
+    def map(self, func, exact=False):
+        """
+        The distribution of a function of the roll of this object.
+
+        :param func: The function to apply to each possible outcome.
+        :type func: callable
+        :param exact: If True, the distribution is kept in exact counts.
+        :type exact: bool
+
+        :return: A :py:class:`Distribution` of the results of func.
+        """
+
+        return self.distribution(exact).map(func)
+
+    def rare_event(self, threshold, count=10 ** 5, *, below=False, theta=None):
+        """
+        Estimates the probability of rolling at least the threshold (or at most
+        it, if below is set) by importance sampling, for events too rare to
+        estimate by rolling normally. Every die is rolled with its faces
+        tilted towards the threshold, and each trial that reaches it counts
+        for the likelihood ratio of its faces, so the estimate stays unbiased
+        while most of the trials land near the event.
+
+        If theta is not given, it is chosen so that the tilted dice would be
+        expected to roll the threshold, taking the total of the faces as a
+        linear stand-in for the value of this object, matched on its mean and
+        standard deviation. Those are taken from a pilot batch of
+        ESTIMATE_CHUNK untilted rolls, rather than from the distribution,
+        which can be far too costly to work out for the kind of object that
+        needs this. A threshold on the likely side of the mean is not rare,
+        and the dice are not tilted for it.
+
+        :param threshold: The value to reach.
+        :param count: The number of trials to roll.
+        :type count: int
+        :param below: If True, the probability of rolling at most the
+            threshold is estimated instead.
+        :type below: bool
+        :param theta: The tilt to use on the faces. Positive values favor high
+            faces, and negative values low faces.
+        :type theta: float
+
+        :return: An Estimate named tuple of the estimated probability, its
+            standard error, and the number of trials rolled.
+        """
+
+        count = int(count)
+        if count < 2:
+            raise ValueError('At least two trials are needed.')
+
+        demand = collections.Counter()
+        self._demand(count, demand)
+        if theta is None:
+            theta = 0.0
+            pilot = self.roll_many(ESTIMATE_CHUNK)
+            mean = statistics.fmean(pilot)
+            variance = statistics.pvariance(pilot, mean)
+            per_trial = {
+                sides: total / count
+                for sides, total in demand.items()
+            }
+            face_mean = math.fsum(
+                num * (sides + 1) / 2
+                for sides, num in per_trial.items()
+            )
+            face_variance = math.fsum(
+                num * (sides ** 2 - 1) / 12
+                for sides, num in per_trial.items()
+            )
+            rare = threshold < mean if below else threshold > mean
+            if rare and variance > 0 and face_variance > 0:
+                theta = solve_tilt(
+                    per_trial,
+                    face_mean +
+                    (threshold - mean) * math.sqrt(face_variance / variance)
+                )
+
+        faces = TiltedFacePool(count, demand, theta)
+        values = self._roll_batch(count, faces)
+        weights = [
+            math.exp(ratio) if (
+                value <= threshold if below else value >= threshold
+            ) else 0.0
+            for value, ratio in zip(values, faces.log_ratios)
+        ]
+        mean = math.fsum(weights) / count
+        error = math.sqrt(
+            math.fsum((weight - mean) ** 2 for weight in weights) /
+            (count - 1) / count
+        )
+        return Estimate(mean, error, count)
+
+    def __compared(self, other, exact):
+        distribution = self.distribution(exact)
+        if isinstance(other, Rollable):
+            return _distribution.difference(
+                distribution,
+                other.distribution(exact)
+            ), 0
+
+        return distribution, other
+
+    def prob_eq(self, other, exact=False):
+        """
+        The probability that a roll of this object equals other, without
+        rolling anything. If other is also a rollable object, the two are
+        treated as rolled independently, and the chance is read off the
+        distribution of their difference.
+
+        :param other: A number, or another rollable object.
+        :param exact: If True, the probability is given as a
+            :py:class:`fractions.Fraction`.
+        :type exact: bool
+
+        :return: The probability.
+        """
+
+        distribution, threshold = self.__compared(other, exact)
+        return distribution.get(threshold, 0)
+
+    def prob_ne(self, other, exact=False):
+        """
+        The probability that a roll of this object does not equal other. See
+        :py:meth:`prob_eq`.
+        """
+
+        distribution, threshold = self.__compared(other, exact)
+        return (
+            distribution.cdf(threshold) -
+            distribution.get(threshold, 0) +
+            distribution.sf(threshold)
+        )
+
+    def prob_lt(self, other, exact=False):
+        """
+        The probability that a roll of this object is less than other. See
+        :py:meth:`prob_eq`.
+        """
+
+        distribution, threshold = self.__compared(other, exact)
+        return distribution.cdf(threshold) - distribution.get(threshold, 0)
+
+    def prob_le(self, other, exact=False):
+        """
+        The probability that a roll of this object is no more than other. See
+        :py:meth:`prob_eq`.
+        """
+
+        distribution, threshold = self.__compared(other, exact)
+        return distribution.cdf(threshold)
+
+    def prob_gt(self, other, exact=False):
+        """
+        The probability that a roll of this object is greater than other. See
+        :py:meth:`prob_eq`.
+        """
+
+        distribution, threshold = self.__compared(other, exact)
+        return distribution.sf(threshold)
+
+    def prob_ge(self, other, exact=False):
+        """
+        The probability that a roll of this object is no less than other. See
+        :py:meth:`prob_eq`.
+        """
+
+        distribution, threshold = self.__compared(other, exact)
+        return distribution.sf(threshold) + distribution.get(threshold, 0)
+
     def __int__(self):
         return int(self.last)
 
@@ -102,6 +1621,9 @@ class Rollable(
     def __le__(self, other):
         return self.last <= other
 
+    def __hash__(self):
+        return hash(self._key())
+
     @abc.abstractmethod
     def __str__(self):
         raise NotImplementedError
@@ -208,117 +1730,651 @@ class Rollable(
     def __rpow__(self, other):
         return DicePower(other, self)
 
-    def __divmod__(self, other):
-        return DiceDivMod(self, other)
+    def __divmod__(self, other):
+        return DiceDivMod(self, other)
+
+    def __rdivmod__(self, other):
+        return DiceDivMod(other, self)
+
+class RollableSequence(collections.abc.Sequence, Rollable):
+    def __init__(self, group=[]):
+        self.__group = tuple(group)
+
+    @property
+    def _group(self):
+        return self.__group
+
+    def __getitem__(self, index):
+        self._group[index]
+
+    def __len__(self):
+        return len(self._group)
+
+    def _demand(self, count, demand):
+        for item in self._group:
+            item._demand(count, demand)
+
+    def _group_batch(self, count, faces):
+        return zip(*[item._roll_batch(count, faces) for item in self._group])
+
+    def _children(self):
+        return self._group
+
+class ScalarRollableSequence(RollableSequence):
+    def __init__(self, items, *, scalar):
+        self.__scalar = scalar
+        super().__init__(items)
+
+    @property
+    def scalar(self):
+        return self.__scalar
+
+class Die(Rollable, HasConvention):
+    def __init__(
+        self,
+        sides,
+        convention=standard_die,
+        *,
+        explode=False,
+        reroll=(),
+        depth=None
+    ):
+        sides = int(sides)
+        if sides < 2:
+            raise ValueError('There must be at least two sides.')
+
+        reroll = frozenset(int(face) for face in reroll)
+        if not reroll <= set(range(1, sides + 1)):
+            raise ValueError('Rerolled faces must be faces of the die.')
+
+        if len(reroll) == sides:
+            raise ValueError('At least one face must not be rerolled.')
+
+        if depth is not None:
+            depth = int(depth)
+            if depth < 0:
+                raise ValueError('The explosion depth cannot be negative.')
+
+        self.__sides = sides
+        self.__explode = bool(explode)
+        self.__reroll = reroll
+        self.__depth = depth
+        HasConvention.__init__(self, convention)
+
+    @property
+    def sides(self):
+        return self.__sides
+
+    @property
+    def explode(self):
+        return self.__explode
+
+    @property
+    def reroll(self):
+        return self.__reroll
+
+    @property
+    def depth(self):
+        return self.__depth
+
+    def __face(self):
+        face = random.randrange(1, self.sides + 1)
+        if face in self.reroll:
+            face = random.randrange(1, self.sides + 1)
+
+        return face
+
+    def _roll(self):
+        face = self.__face()
+        ret = self.convention(face)
+        explosions = 0
+        while (
+            self.explode and
+            face == self.sides and
+            (self.depth is None or explosions < self.depth)
+        ):
+            face = random.randrange(1, self.sides + 1)
+            ret += self.convention(face)
+            explosions += 1
+
+        return ret
+
+    def _demand(self, count, demand):
+        demand[self.sides] += count
+
+    def _roll_batch(self, count, faces):
+        rolled = faces.take(self.sides, count)
+        if self.reroll:
+            indices = [
+                index
+                for index, face in enumerate(rolled)
+                if face in self.reroll
+            ]
+            for index, face in zip(
+                indices,
+                faces.extra(self.sides, len(indices))
+            ):
+                rolled[index] = face
+
+        if self.convention is standard_die:
+            values = rolled
+        else:
+            values = convention_batch(self.convention, rolled)
+
+        if self.explode:
+            indices = [
+                index
+                for index, face in enumerate(rolled)
+                if face == self.sides
+            ]
+            explosions = 0
+            while indices and (self.depth is None or explosions < self.depth):
+                exploded = faces.extra(self.sides, len(indices))
+                for index, value in zip(
+                    indices,
+                    exploded
+                    if self.convention is standard_die
+                    else convention_batch(self.convention, exploded)
+                ):
+                    values[index] += value
+
+                indices = [
+                    index
+                    for index, face in zip(indices, exploded)
+                    if face == self.sides
+                ]
+                explosions += 1
+
+        return values
+
+    def _distribution(self, exact):
+        faces = range(1, self.sides + 1)
+        if self.reroll:
+            first = _distribution.Distribution(
+                {
+                    face: self.sides * (face not in self.reroll) +
+                    len(self.reroll)
+                    for face in faces
+                },
+                self.sides ** 2
+            )
+        else:
+            first = _distribution.uniform(faces, exact=True)
+
+        if not exact:
+            first = _distribution.to_float(first)
+
+        if not self.explode:
+            transform = getattr(self.convention, 'transform', None)
+            if transform is None:
+                return _distribution.transform(first, self.convention)
+
+            return transform(first)
+
+        return _distribution.explode(
+            first,
+            _distribution.uniform(faces, exact),
+            self.sides,
+            EXPLODE_DEPTH if self.depth is None else self.depth,
+            self.convention,
+            truncate=self.depth is None
+        )
+
+    def copy(self):
+        return Die(
+            self.sides,
+            self.convention,
+            explode=self.explode,
+            reroll=self.reroll,
+            depth=self.depth
+        )
+
+    def _structure(self):
+        return structure_of(
+            type(self),
+            self.convention,
+            self.sides,
+            self.explode,
+            self.reroll,
+            self.depth
+        )
+
+    def __str__(self):
+        ret = ''.join(['d', str(self.sides)])
+        if self.reroll:
+            ret = ''.join(
+                [ret] + ['r' + str(face) for face in sorted(self.reroll)]
+            )
+
+        if self.explode:
+            ret = ''.join([ret, '!'])
+            if self.depth is not None:
+                ret = ''.join([ret, str(self.depth)])
+
+        return ret
+
+    def __repr__(self):
+        ret = [repr(self.sides)]
+        if self.explode:
+            ret.append('explode=True')
+
+        if self.reroll:
+            ret.append(''.join(['reroll=', repr(tuple(sorted(self.reroll)))]))
+
+        if self.depth is not None:
+            ret.append(''.join(['depth=', repr(self.depth)]))
+
+        return ''.join(['Die(', ', '.join(ret), ')'])
+
+class Dice(RollableSequence, HasConvention):
+    def __new__(
+        cls,
+        num,
+        rollable,
+        convention=standard_dice,
+        *,
+        explode=False,
+        reroll=(),
+        depth=None
+    ):
+        num = int(num)
+        num = int(num)
+        if num < 1:
+            raise ValueError('There must be at least one rollable.')
+
+        if explode or reroll or depth is not None:
+            if not isinstance(rollable, Die):
+                raise ValueError('Only a Die can explode or be rerolled.')
+
+            rollable = Die(
+                rollable.sides,
+                rollable.convention,
+                explode=explode or rollable.explode,
+                reroll=rollable.reroll | frozenset(reroll),
+                depth=rollable.depth if depth is None else depth
+            )
+
+        if isinstance(rollable, Dice) and rollable.convention is standard_dice:
+            num = num * rollable.num
+            rollable = rollable.die
+
+        if num == 1:
+            return rollable.copy()
+
+        ret = super().__new__(cls)
+        RollableSequence.__init__(ret, (rollable.copy() for i in range(num)))
+        HasConvention.__init__(ret, convention)
+        return ret
+
+    def __init__(
+        self,
+        num,
+        rollable,
+        convention=standard_dice,
+        *,
+        explode=False,
+        reroll=(),
+        depth=None
+    ):
+        pass
+
+    def _roll(self):
+        return self.convention(item() for item in self._group)
+
+    def _demand(self, count, demand):
+        self.die._demand(count * self.num, demand)
+
+    def _roll_batch(self, count, faces):
+        num = self.num
+        if self.die._shared_nodes():
+            faces = expanded(faces, count, num)
+
+        values = self.die._roll_batch(count * num, faces)
+        rows = (
+            values[start:start + num]
+            for start in range(0, count * num, num)
+        )
+        return convention_batch(self.convention, rows)
+
+    def _distribution(self, exact):
+        distribution = self.die.distribution(exact)
+        if self.convention is standard_dice:
+            previous = None
+            if not self.die._shared_nodes() and not ROLL_SCOPE.fixed:
+                previous = cached_distribution(
+                    self.__structure(self.num - 1),
+                    exact
+                )
+
+            if previous is not None:
+                return _distribution.convolve(previous, distribution)
+
+            return _distribution.convolve_power(distribution, self.num)
+
+        transform = getattr(self.convention, 'transform', None)
+        if transform is not None:
+            return transform(distribution, self.num)
+
+        return _distribution.enumerate_dice(
+            distribution,
+            self.num,
+            self.convention
+        )
+
+    def _distribution_mod(self, modulus, exact=False):
+        if self.convention is not standard_dice or self._shared_nodes():
+            return super()._distribution_mod(modulus, exact)
+
+        return _distribution.convolve_power(
+            self.die._distribution_mod(modulus, exact),
+            self.num,
+            modulus
+        )
+
+    def _shared_nodes(self):
+        return self.die._shared_nodes()
+
+    def _cumulants(self):
+        if self._shared_nodes():
+            return None
+
+        if self.convention is not standard_dice:
+            return super()._cumulants()
+
+        return tuple(self.num * value for value in self.die._cumulants())
+
+    def _lattice(self):
+        if self._shared_nodes():
+            return None
+
+        if self.convention is not standard_dice:
+            return super()._lattice()
+
+        lattice = self.die._lattice()
+        if lattice is None:
+            return None
+
+        low, high, step = lattice
+        return self.num * low, self.num * high, step
+
+    @property
+    def die(self):
+        try:
+            return self.__die
+
+        except AttributeError:
+            self.__die = self._group[0].copy()
+            return self.__die
+
+    @property
+    def num(self):
+        try:
+            return self.__num
+
+        except AttributeError:
+            self.__num = len(self)
+            return self.__num
+
+    def roll_result(self):
+        """
+        Rolls the dice and keeps every die's face in a :py:class:`RollResult`,
+        so that reroll mechanics can change a few of the dice without rolling
+        and adding up the whole pool again.
+
+        :return: The :py:class:`RollResult` of the roll.
+        """
+
+        die = self.die
+        if (
+            not isinstance(die, Die) or
+            die.explode or
+            die.reroll or
+            die.convention is not standard_die
+        ):
+            raise ValueError('Only plain dice can be kept as a roll result.')
+
+        return RollResult(
+            die.sides,
+            random.choices(range(1, die.sides + 1), k=self.num)
+        )
+
+    def copy(self):
+        return Dice(self.num, self.die.copy(), self.convention)
+
+    def __structure(self, num):
+        if num == 1:
+            return self.die._key()
+
+        return structure_of(type(self), self.convention, num, self.die)
+
+    def _structure(self):
+        return self.__structure(self.num)
+
+    def __str__(self):
+        ret = ''.join([str(self.num), str(self.die)])
+        if isinstance(self.convention, Keep):
+            ret = ''.join([ret, str(self.convention)])
+
+        return ret
+
+    def __repr__(self):
+        ret = ', '.join([repr(self.num), repr(self.die)])
+        if self.convention is not standard_dice:
+            ret = ', '.join([ret, repr(self.convention)])
+
+        return ''.join(['Dice(', ret, ')'])
+
+class DicePool(Rollable):
+    """
+    A pool of dice that counts successes rather than adding the dice up. Every
+    die showing at least the target is a success, every die showing at least
+    double (if given) counts as two successes, and every die showing at most
+    botch (if given) takes a success away.
+    """
+
+    def __init__(self, num, rollable, target, *, double=None, botch=None):
+        num = int(num)
+        if num < 1:
+            raise ValueError('There must be at least one rollable.')
+
+        if double is not None and double < target:
+            raise ValueError('Double successes must also be successes.')
 
-    def __rdivmod__(self, other):
-        return DiceDivMod(other, self)
+        if botch is not None and botch >= target:
+            raise ValueError('Botches cannot also be successes.')
 
-class RollableSequence(collections.abc.Sequence, Rollable):
-    def __init__(self, group=[]):
-        self.__group = tuple(group)
+        self.__num = num
+        self.__die = rollable.copy()
+        self.__target = target
+        self.__double = double
+        self.__botch = botch
 
     @property
-    def _group(self):
-        return self.__group
+    def num(self):
+        return self.__num
 
-    def __getitem__(self, index):
-        self._group[index]
+    @property
+    def die(self):
+        return self.__die
 
-    def __len__(self):
-        return len(self._group)
+    @property
+    def target(self):
+        return self.__target
 
-class ScalarRollableSequence(RollableSequence):
-    def __init__(self, items, *, scalar):
-        self.__scalar = scalar
-        super().__init__(items)
+    @property
+    def double(self):
+        return self.__double
 
     @property
-    def scalar(self):
-        return self.__scalar
+    def botch(self):
+        return self.__botch
 
-class Die(Rollable, HasConvention):
-    def __init__(self, sides, convention=standard_die):
-        sides = int(sides)
-        if sides < 2:
-            raise ValueError('There must be at least two sides.')
+    def successes(self, value):
+        ret = int(value >= self.target)
+        if self.double is not None:
+            ret += value >= self.double
 
-        self.__sides = sides
-        HasConvention.__init__(self, convention)
+        if self.botch is not None:
+            ret -= value <= self.botch
 
-    @property
-    def sides(self):
-        return self.__sides
+        return ret
 
     def _roll(self):
-        return self.convention(random.randrange(1, self.sides + 1))
+        return sum(self.successes(self.die()) for i in range(self.num))
+
+    def _demand(self, count, demand):
+        self.die._demand(count * self.num, demand)
+
+    def _roll_batch(self, count, faces):
+        num = self.num
+        if self.die._shared_nodes():
+            faces = expanded(faces, count, num)
+
+        values = self.die._roll_batch(count * num, faces)
+        scores = {
+            value: self.successes(value)
+            for value in set(values)
+        }
+        values = list(map(scores.__getitem__, values))
+        return [
+            sum(values[start:start + num])
+            for start in range(0, count * num, num)
+        ]
+
+    def _children(self):
+        return (self.die,) * self.num
+
+    def _shared_nodes(self):
+        return self.die._shared_nodes()
+
+    def _distribution(self, exact):
+        return _distribution.multinomial(
+            _distribution.transform(
+                self.die.distribution(exact),
+                self.successes
+            ),
+            self.num
+        )
 
     def copy(self):
-        return Die(self.sides)
+        return DicePool(
+            self.num,
+            self.die.copy(),
+            self.target,
+            double=self.double,
+            botch=self.botch
+        )
 
-    def __hash__(self):
-        return hash((type(Die), self.convention, self.sides))
+    def _structure(self):
+        return structure_of(
+            type(self),
+            self.num,
+            self.die,
+            self.target,
+            self.double,
+            self.botch
+        )
 
     def __str__(self):
-        return ''.join(['d', str(self.sides)])
+        ret = ''.join([
+            str(self.num),
+            self.die.paren_str()
+            if isinstance(self.die, Parenthesize)
+            else str(self.die),
+            '>=',
+            str(self.target)
+        ])
+        if self.double is not None:
+            ret = ''.join([ret, '!!', str(self.double)])
+
+        if self.botch is not None:
+            ret = ''.join([ret, '-', str(self.botch)])
+
+        return ret
 
     def __repr__(self):
-        return ''.join(['Die(', repr(self.sides), ')'])
+        ret = [repr(self.num), repr(self.die), repr(self.target)]
+        if self.double is not None:
+            ret.append(''.join(['double=', repr(self.double)]))
 
-class Dice(RollableSequence, HasConvention):
-    def __new__(cls, num, rollable, convention=standard_dice):
-        num = int(num)
-        num = int(num)
-        if num < 1:
-            raise ValueError('There must be at least one rollable.')
+        if self.botch is not None:
+            ret.append(''.join(['botch=', repr(self.botch)]))
 
-        if isinstance(rollable, Dice):
-            num = num * rollable.num
-            rollable = rollable.die
+        return ''.join(['DicePool(', ', '.join(ret), ')'])
 
-        if num == 1:
-            return rollable.copy()
+class DiceShared(Rollable):
+    """
+    A rollable object that stands for a single roll of another, shared by
+    every place it is used, so that one roll can decide more than one thing,
+    like the same d20 deciding both whether an attack hits and whether it is a
+    critical hit. Copying it gives back the same object, so it stays shared
+    when it is built into bigger expressions, and it rolls only once each time
+    the expression as a whole is rolled, once per trial when rolling in
+    batches. The distribution of an expression that uses it in more than one
+    place is worked out by conditioning on each of its values in turn.
+    """
 
+    def __new__(cls, rollable):
         ret = super().__new__(cls)
-        RollableSequence.__init__(ret, (rollable.copy() for i in range(num)))
-        HasConvention.__init__(ret, convention)
+        ret.__rollable = rollable.copy()
         return ret
 
-    def __init__(self, num, rollable, convention=standard_dice):
+    def __init__(self, rollable):
         pass
 
+    @property
+    def rollable(self):
+        return self.__rollable
+
     def _roll(self):
-        return self.convention(item() for item in self._group)
+        memo = ROLL_SCOPE.memo
+        if memo is None:
+            return self.rollable()
 
-    @property
-    def die(self):
         try:
-            return self.__die
+            return memo[id(self)]
 
-        except AttributeError:
-            self.__die = self._group[0].copy()
-            return self.__die
+        except KeyError:
+            memo[id(self)] = self.rollable()
+            return memo[id(self)]
 
-    @property
-    def num(self):
-        try:
-            return self.__num
+    def _demand(self, count, demand):
+        self.rollable._demand(count, demand)
 
-        except AttributeError:
-            self.__num = len(self)
-            return self.__num
+    def _roll_batch(self, count, faces):
+        values = faces.shared(self)
+        if len(values) != count:
+            raise ValueError('A shared roll was asked for out of step.')
+
+        return list(values)
+
+    def _children(self):
+        return (self.rollable,)
+
+    def _shared_nodes(self):
+        ret = dict(self.rollable._shared_nodes())
+        ret[id(self)] = self
+        return ret
+
+    def _distribution(self, exact):
+        fixed = ROLL_SCOPE.fixed
+        if fixed and id(self) in fixed:
+            return _distribution.point(fixed[id(self)])
+
+        return self.rollable.distribution(exact)
 
     def copy(self):
-        return Dice(self.num, self.die.copy())
+        return self
 
-    def __hash__(self):
-        return hash((type(self), self.convention) + self._group)
+    def _structure(self):
+        return structure_of(type(self), object(), self.rollable)
 
     def __str__(self):
-        return ''.join([str(self.num), str(self.die)])
+        return ''.join(['shared(', str(self.rollable), ')'])
 
     def __repr__(self):
-        return ''.join(['Dice(', repr(self.num), ', ', repr(self.die), ')'])
+        return ''.join(['DiceShared(', repr(self.rollable), ')'])
+
 
 class DiceAdder(ScalarRollableSequence, Parenthesize):
     def __new__(cls, *adders, scalar=0):
@@ -350,47 +2406,50 @@ class DiceAdder(ScalarRollableSequence, Parenthesize):
         merged_adders = []
         if Dice in mappings:
             dice_items = mappings.pop(Dice)
-            items = {
-                dtype: sum(
-                    len(item)
-                    for item in dice_items
-                    if hash(item.die) == hash(dtype)
-                )
-                for dtype in {item.die for item in dice_items}
-            }
+            merged_adders.extend(
+                item
+                for item in dice_items
+                if item.convention is not standard_dice
+            )
+            dice_items = [
+                (item.die, len(item))
+                for item in dice_items
+                if item.convention is standard_dice
+            ]
         else:
-            items = {}
+            dice_items = []
 
         if Die in mappings:
-            die_items = mappings.pop(Die)
+            dice_items.extend((item, 1) for item in mappings.pop(Die))
 
-            for dtype, count in (
-                (
-                    set_item,
-                    len([
-                        item
-                        for item in die_items
-                        if hash(item) == hash(set_item)
-                    ])
-                )
-                for set_item in set(die_items)
-            ):
-                items[dtype] = items.get(dtype, 0) + count
+        items = {}
+        for die, count in dice_items:
+            first, total = items.get(die._key(), (die, 0))
+            items[die._key()] = (first, total + count)
 
         merged_adders.extend(
             (Dice(count, die) if count > 1 else die)
-            for die, count in items.items()
+            for die, count in items.values()
         )
 
         if DiceMultiplier in mappings:
             multiplier_items = mappings.pop(DiceMultiplier)
+            merged_adders.extend(
+                item
+                for item in multiplier_items
+                if len(item) != 1
+            )
+            multiplier_items = [
+                item
+                for item in multiplier_items
+                if len(item) == 1
+            ]
             merged_adders.extend([
                 DiceMultiplier(
                     DiceAdder(*[
                         elem
                         for item in multiplier_items
-                        for group in item._group
-                        for elem in group
+                        for elem in item._group
                         if item.scalar == ms
                     ]),
                     scalar=ms
@@ -447,14 +2506,74 @@ class DiceAdder(ScalarRollableSequence, Parenthesize):
     def _roll(self):
         return sum(item() for item in self._group) + self.scalar
 
+    def _roll_batch(self, count, faces):
+        return [
+            sum(values) + self.scalar
+            for values in self._group_batch(count, faces)
+        ]
+
+    def _distribution(self, exact):
+        return _distribution.transform(
+            _distribution.convolve(
+                *[item.distribution(exact) for item in self._group],
+                executor=WORKERS.executor,
+                workers=WORKERS.size
+            ),
+            functools.partial(operator.add, self.scalar)
+        )
+
+    def _distribution_mod(self, modulus, exact=False):
+        if self._shared_nodes():
+            return super()._distribution_mod(modulus, exact)
+
+        return _distribution.transform(
+            _distribution.convolve(
+                *[
+                    item._distribution_mod(modulus, exact)
+                    for item in self._group
+                ],
+                modulus=modulus
+            ),
+            lambda value: (value + self.scalar) % modulus
+        )
+
+    def _cumulants(self):
+        if self._shared_nodes():
+            return None
+
+        ret = [
+            sum(values)
+            for values in zip(*[item._cumulants() for item in self._group])
+        ]
+        ret[0] += self.scalar
+        return tuple(ret)
+
+    def _lattice(self):
+        if self._shared_nodes():
+            return None
+
+        if not isinstance(self.scalar, numbers.Integral):
+            return None
+
+        lattices = [item._lattice() for item in self._group]
+        if None in lattices:
+            return None
+
+        lows, highs, steps = zip(*lattices)
+        return (
+            sum(lows) + self.scalar,
+            sum(highs) + self.scalar,
+            functools.reduce(math.gcd, steps)
+        )
+
     def copy(self):
         return DiceAdder(
             *[item.copy() for item in self._group],
             scalar=self.scalar
         )
 
-    def __hash__(self):
-        return hash((type(self), self.scalar) + self._group)
+    def _structure(self):
+        return structure_of(type(self), self.scalar, *self._group)
 
     def __str__(self):
         ret = ' + '.join(
@@ -583,14 +2702,83 @@ class DiceMultiplier(ScalarRollableSequence, Parenthesize):
             )
         ) * self.scalar
 
+    def _roll_batch(self, count, faces):
+        return [
+            functools.reduce(operator.mul, values) * self.scalar
+            for values in self._group_batch(count, faces)
+        ]
+
+    def _distribution(self, exact):
+        return _distribution.transform(
+            functools.reduce(
+                _distribution.multiply,
+                [item.distribution(exact) for item in self._group]
+            ),
+            lambda value: value * self.scalar
+        )
+
+    def _distribution_mod(self, modulus, exact=False):
+        if self._shared_nodes():
+            return super()._distribution_mod(modulus, exact)
+
+        if not isinstance(self.scalar, numbers.Integral) or not all(
+            lattice is not None and
+            isinstance(lattice[0], numbers.Integral) and
+            isinstance(lattice[2], numbers.Integral)
+            for lattice in (item._lattice() for item in self._group)
+        ):
+            return super()._distribution_mod(modulus, exact)
+
+        return _distribution.transform(
+            functools.reduce(
+                functools.partial(
+                    _distribution.combine,
+                    func=lambda left, right: left * right % modulus
+                ),
+                [
+                    item._distribution_mod(modulus, exact)
+                    for item in self._group
+                ]
+            ),
+            lambda value: value * self.scalar % modulus
+        )
+
+    def _cumulants(self):
+        if len(self._group) != 1:
+            return super()._cumulants()
+
+        mean, variance, third, fourth, absolute = self._group[0]._cumulants()
+        return (
+            mean * self.scalar,
+            variance * self.scalar ** 2,
+            third * self.scalar ** 3,
+            fourth * self.scalar ** 4,
+            absolute * abs(self.scalar) ** 3
+        )
+
+    def _lattice(self):
+        if (
+            len(self._group) != 1 or
+            not isinstance(self.scalar, numbers.Integral)
+        ):
+            return super()._lattice()
+
+        lattice = self._group[0]._lattice()
+        if lattice is None:
+            return None
+
+        low, high, step = lattice
+        low, high = sorted([low * self.scalar, high * self.scalar])
+        return low, high, step * abs(self.scalar) or 1
+
     def copy(self):
         return DiceMultiplier(
             *[item.copy() for item in self._group],
             scalar=self.scalar
         )
 
-    def __hash__(self):
-        return hash((type(self), self.scalar) + self._group)
+    def _structure(self):
+        return structure_of(type(self), self.scalar, *self._group)
 
     def __str__(self):
         if self.scalar == 0:
@@ -625,41 +2813,21 @@ class DiceMultiplier(ScalarRollableSequence, Parenthesize):
 
 class DiceFloorDivider(Rollable, Parenthesize):
     def __new__(cls, numerator, denominator):
-        if not denominator:
+        if not isinstance(denominator, Rollable) and not denominator:
             raise ZeroDivisionError
 
-        if isinstance(numerator, DiceFloorDivider):
-            new_numerator = numerator.numerator
-            new_denominator = numerator.denominator
-
-        else:
-            new_numerator = numerator
-            new_denominator = 1
-
-        if isinstance(denominator, DiceFloorDivider):
-            new_numerator *= denominator.denominator
-            new_denominator *= denominator.numerator
-
-        else:
-            new_denominator *= denominator
-
-        numerator = new_numerator
-        denominator = new_denominator
-
         if (
-            isinstance(numerator, DiceMultiplier) and
-            isinstance(denominator, DiceMultiplier)
+            isinstance(numerator, DiceFloorDivider) and
+            isinstance(denominator, numbers.Integral) and
+            not isinstance(denominator, Rollable) and
+            denominator > 0
         ):
-            new_scalar = numerator.scalar / denominator.scalar
-            numerator = DiceMultiplier(*numerator._group, scalar=new_scalar)
-            denominator = DiceMultiplier(*denominator._group)
+            denominator = numerator.denominator * denominator
+            numerator = numerator.numerator
 
-        elif not isinstance(denominator, Rollable) and denominator == 1:
+        if not isinstance(denominator, Rollable) and denominator == 1:
             ret = numerator
 
-        elif not isinstance(denominator, Rollable):
-            ret = DiceMultiplier(numerator, scalar=1 / denominator)
-
         else:
             ret = super().__new__(cls)
             ret.__numerator = numerator
@@ -678,6 +2846,9 @@ class DiceFloorDivider(Rollable, Parenthesize):
     def denominator(self):
         return self.__denominator
 
+    def _children(self):
+        return rollables_of(self.numerator, self.denominator)
+
     def _roll(self):
         try:
             numerator = self.numerator()
@@ -691,6 +2862,24 @@ class DiceFloorDivider(Rollable, Parenthesize):
 
         return numerator // denominator
 
+    def _demand(self, count, demand):
+        demand_of(self.numerator, count, demand)
+        demand_of(self.denominator, count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(
+            operator.floordiv,
+            batch_of(self.numerator, count, faces),
+            batch_of(self.denominator, count, faces)
+        ))
+
+    def _distribution(self, exact):
+        return _distribution.combine(
+            distribution_of(self.numerator, exact),
+            distribution_of(self.denominator, exact),
+            operator.floordiv
+        )
+
     def copy(self):
         try:
             numerator = self.numerator.copy()
@@ -704,8 +2893,8 @@ class DiceFloorDivider(Rollable, Parenthesize):
 
         return DiceFloorDivider(numerator, denominator)
 
-    def __hash__(self):
-        return hash(type(self), self.numerator, self.denominator)
+    def _structure(self):
+        return structure_of(type(self), self.numerator, self.denominator)
 
     def __str__(self):
         return ' // '.join([
@@ -731,7 +2920,7 @@ class DiceFloorDivider(Rollable, Parenthesize):
 
 class DiceTrueDivider(Rollable, Parenthesize):
     def __new__(cls, numerator, denominator):
-        if not denominator:
+        if not isinstance(denominator, Rollable) and not denominator:
             raise ZeroDivisionError
 
         if isinstance(numerator, DiceTrueDivider):
@@ -760,12 +2949,9 @@ class DiceTrueDivider(Rollable, Parenthesize):
             numerator = DiceMultiplier(*numerator._group, scalar=new_scalar)
             denominator = DiceMultiplier(*denominator._group)
 
-        elif not isinstance(denominator, Rollable) and denominator == 1:
+        if not isinstance(denominator, Rollable) and denominator == 1:
             ret = numerator
 
-        elif not isinstance(denominator, Rollable):
-            ret = DiceMultiplier(numerator, scalar=1 / denominator)
-
         else:
             ret = super().__new__(cls)
             ret.__numerator = numerator
@@ -784,6 +2970,9 @@ class DiceTrueDivider(Rollable, Parenthesize):
     def denominator(self):
         return self.__denominator
 
+    def _children(self):
+        return rollables_of(self.numerator, self.denominator)
+
     def _roll(self):
         try:
             numerator = self.numerator()
@@ -797,6 +2986,24 @@ class DiceTrueDivider(Rollable, Parenthesize):
 
         return numerator / denominator
 
+    def _demand(self, count, demand):
+        demand_of(self.numerator, count, demand)
+        demand_of(self.denominator, count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(
+            operator.truediv,
+            batch_of(self.numerator, count, faces),
+            batch_of(self.denominator, count, faces)
+        ))
+
+    def _distribution(self, exact):
+        return _distribution.combine(
+            distribution_of(self.numerator, exact),
+            distribution_of(self.denominator, exact),
+            _distribution.true_divide
+        )
+
     def copy(self):
         try:
             numerator = self.numerator.copy()
@@ -810,8 +3017,8 @@ class DiceTrueDivider(Rollable, Parenthesize):
 
         return DiceTrueDivider(numerator, denominator)
 
-    def __hash__(self):
-        return hash(type(self), self.numerator, self.denominator)
+    def _structure(self):
+        return structure_of(type(self), self.numerator, self.denominator)
 
     def __str__(self):
         return ' / '.join([
@@ -837,46 +3044,12 @@ class DiceTrueDivider(Rollable, Parenthesize):
 
 class DiceDivMod(Rollable):
     def __new__(cls, numerator, denominator):
-        if not denominator:
+        if not isinstance(denominator, Rollable) and not denominator:
             raise ZeroDivisionError
 
-        if isinstance(numerator, DiceDivMod):
-            new_numerator = numerator.numerator
-            new_denominator = numerator.denominator
-
-        else:
-            new_numerator = numerator
-            new_denominator = 1
-
-        if isinstance(denominator, DiceDivMod):
-            new_numerator *= denominator.denominator
-            new_denominator *= denominator.numerator
-
-        else:
-            new_denominator *= denominator
-
-        numerator = new_numerator
-        denominator = new_denominator
-
-        if (
-            isinstance(numerator, DiceMultiplier) and
-            isinstance(denominator, DiceMultiplier)
-        ):
-            new_scalar = numerator.scalar / denominator.scalar
-            numerator = DiceMultiplier(*numerator._group, scalar=new_scalar)
-            denominator = DiceMultiplier(*denominator._group)
-
-        elif not isinstance(denominator, Rollable) and denominator == 1:
-            ret = numerator
-
-        elif not isinstance(denominator, Rollable):
-            ret = DiceMultiplier(numerator, scalar=1 / denominator)
-
-        else:
-            ret = super().__new__(cls)
-            ret.__numerator = numerator
-            ret.__denominator = denominator
-
+        ret = super().__new__(cls)
+        ret.__numerator = numerator
+        ret.__denominator = denominator
         return ret
 
     def __init__(self, numerator, divisor):
@@ -890,6 +3063,9 @@ class DiceDivMod(Rollable):
     def denominator(self):
         return self.__denominator
 
+    def _children(self):
+        return rollables_of(self.numerator, self.denominator)
+
     def _roll(self):
         try:
             numerator = self.numerator()
@@ -903,6 +3079,24 @@ class DiceDivMod(Rollable):
 
         return divmod(numerator, denominator)
 
+    def _demand(self, count, demand):
+        demand_of(self.numerator, count, demand)
+        demand_of(self.denominator, count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(
+            divmod,
+            batch_of(self.numerator, count, faces),
+            batch_of(self.denominator, count, faces)
+        ))
+
+    def _distribution(self, exact):
+        return _distribution.combine(
+            distribution_of(self.numerator, exact),
+            distribution_of(self.denominator, exact),
+            divmod
+        )
+
     def copy(self):
         try:
             numerator = self.numerator.copy()
@@ -916,8 +3110,8 @@ class DiceDivMod(Rollable):
 
         return DiceDivMod(numerator, denominator)
 
-    def __hash__(self):
-        return hash(type(self), self.numerator, self.denominator)
+    def _structure(self):
+        return structure_of(type(self), self.numerator, self.denominator)
 
     def __str__(self):
         return ''.join([
@@ -966,7 +3160,7 @@ class DiceBitwiseAnd(ScalarRollableSequence, Parenthesize):
                 for group in value_items
                 for item in group
             )
-            scalar |= functools.reduce(
+            scalar &= functools.reduce(
                 operator.and_,
                 (
                     item
@@ -994,7 +3188,7 @@ class DiceBitwiseAnd(ScalarRollableSequence, Parenthesize):
                 else:
                     mappings[type_] = items
 
-        merged_adders = []
+        merged_values = []
 
         if mappings:
             rollable_items, scalars = zip(*[
@@ -1015,7 +3209,7 @@ class DiceBitwiseAnd(ScalarRollableSequence, Parenthesize):
             ])
 
 
-            merged_adders.extend(
+            merged_values.extend(
                 item
                 for group in (
                     items
@@ -1038,7 +3232,7 @@ class DiceBitwiseAnd(ScalarRollableSequence, Parenthesize):
         if not scalar:
             ret = 0
 
-        elif len(merged_values) == 1:
+        elif scalar == -1 and len(merged_values) == 1:
             ret = merged_values[0]
 
         else:
@@ -1067,14 +3261,31 @@ class DiceBitwiseAnd(ScalarRollableSequence, Parenthesize):
 
         return ret
 
+    def _roll_batch(self, count, faces):
+        ret = [
+            functools.reduce(operator.and_, values)
+            for values in self._group_batch(count, faces)
+        ]
+        if self.scalar is not None:
+            ret = [value & self.scalar for value in ret]
+
+        return ret
+
+    def _distribution(self, exact):
+        return _distribution.bitwise(
+            [item.distribution(exact) for item in self._group],
+            operator.and_,
+            -1 if self.scalar is None else self.scalar
+        )
+
     def copy(self):
         return DiceBitwiseAnd(
             *[item.copy() for item in self._group],
             scalar=self.scalar
         )
 
-    def __hash__(self):
-        return hash((type(self), self.scalar) + self._group)
+    def _structure(self):
+        return structure_of(type(self), self.scalar, *self._group)
 
     def __str__(self):
         if self.scalar == 0:
@@ -1190,7 +3401,7 @@ class DiceBitwiseOr(ScalarRollableSequence, Parenthesize):
                 0
             )
 
-        if len(merged_values) == 1:
+        if not scalar and len(merged_values) == 1:
             ret = merged_values[0]
 
         else:
@@ -1203,7 +3414,7 @@ class DiceBitwiseOr(ScalarRollableSequence, Parenthesize):
 
         return ret
 
-    def __init__(self, *values, scalar):
+    def __init__(self, *values, scalar=0):
         pass
 
     def _roll(self):
@@ -1217,14 +3428,27 @@ class DiceBitwiseOr(ScalarRollableSequence, Parenthesize):
 
         return ret
 
+    def _roll_batch(self, count, faces):
+        return [
+            functools.reduce(operator.or_, values) | self.scalar
+            for values in self._group_batch(count, faces)
+        ]
+
+    def _distribution(self, exact):
+        return _distribution.bitwise(
+            [item.distribution(exact) for item in self._group],
+            operator.or_,
+            self.scalar
+        )
+
     def copy(self):
         return DiceBitwiseOr(
             *[item.copy() for item in self._group],
             scalar=self.scalar
         )
 
-    def __hash__(self):
-        return hash((type(self), self.scalar) + self._group)
+    def _structure(self):
+        return structure_of(type(self), self.scalar, *self._group)
 
     def __str__(self):
         ret = ' | '.join(
@@ -1240,7 +3464,7 @@ class DiceBitwiseOr(ScalarRollableSequence, Parenthesize):
 
     def __repr__(self):
         ret = ', '.join(repr(item) for item in self._group)
-        if self.scalar is not None:
+        if self.scalar:
             ret = ', '.join([ret, repr(self.scalar)])
 
         return ''.join(['DiceBitwiseOr(', ret, ')'])
@@ -1268,7 +3492,7 @@ class DiceBitwiseXOr(ScalarRollableSequence, Parenthesize):
                 for item in group
             )
             scalar ^= functools.reduce(
-                operator.xor_,
+                operator.xor,
                 (
                     item
                     for item in scalars
@@ -1301,7 +3525,7 @@ class DiceBitwiseXOr(ScalarRollableSequence, Parenthesize):
                 (
                     items if is_rollable else None,
 
-                    functools.reduce(operator.xor_, items)
+                    functools.reduce(operator.xor, items)
                     if not is_rollable
                     else None
                 )
@@ -1325,7 +3549,7 @@ class DiceBitwiseXOr(ScalarRollableSequence, Parenthesize):
                 for item in group
             )
             scalar ^= functools.reduce(
-                operator.or_,
+                operator.xor,
                 (
                     item
                     for item in scalars
@@ -1334,7 +3558,7 @@ class DiceBitwiseXOr(ScalarRollableSequence, Parenthesize):
                 0
             )
 
-        if len(merged_values) == 1:
+        if not scalar and len(merged_values) == 1:
             ret = merged_values[0]
 
         else:
@@ -1347,12 +3571,12 @@ class DiceBitwiseXOr(ScalarRollableSequence, Parenthesize):
 
         return ret
 
-    def __init__(self, *values, scalar):
+    def __init__(self, *values, scalar=0):
         pass
 
     def _roll(self):
         ret = functools.reduce(
-            operator.xor_,
+            operator.xor,
             (
                 item()
                 for item in self._group
@@ -1361,14 +3585,27 @@ class DiceBitwiseXOr(ScalarRollableSequence, Parenthesize):
 
         return ret
 
+    def _roll_batch(self, count, faces):
+        return [
+            functools.reduce(operator.xor, values) ^ self.scalar
+            for values in self._group_batch(count, faces)
+        ]
+
+    def _distribution(self, exact):
+        return _distribution.bitwise(
+            [item.distribution(exact) for item in self._group],
+            operator.xor,
+            self.scalar
+        )
+
     def copy(self):
         return DiceBitwiseXOr(
             *[item.copy() for item in self._group],
             scalar=self.scalar
         )
 
-    def __hash__(self):
-        return hash((type(self), self.scalar) + self._group)
+    def _structure(self):
+        return structure_of(type(self), self.scalar, *self._group)
 
     def __str__(self):
         ret = ' ^ '.join(
@@ -1384,7 +3621,7 @@ class DiceBitwiseXOr(ScalarRollableSequence, Parenthesize):
 
     def __repr__(self):
         ret = ', '.join(repr(item) for item in self._group)
-        if self.scalar is not None:
+        if self.scalar:
             ret = ', '.join([ret, repr(self.scalar)])
 
         return ''.join(['DiceBitwiseXOr(', ret, ')'])
@@ -1408,14 +3645,29 @@ class DiceBitwiseInvert(Rollable):
     def _element(self):
         return self.__element
 
+    def _children(self):
+        return (self._element,)
+
     def copy(self):
         return DiceBitwiseInvert(self._element.copy())
 
     def _roll(self):
         return ~(self._element())
 
-    def __hash__(self):
-        return hash((type(self), self._element))
+    def _demand(self, count, demand):
+        self._element._demand(count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(operator.invert, self._element._roll_batch(count, faces)))
+
+    def _distribution(self, exact):
+        return _distribution.transform(
+            self._element.distribution(exact),
+            operator.invert
+        )
+
+    def _structure(self):
+        return structure_of(type(self), self._element)
 
     def __str__(self):
         return ''.join([
@@ -1431,8 +3683,13 @@ class DiceBitwiseInvert(Rollable):
 
 class DiceBitwiseShift(Rollable, Parenthesize):
     def __new__(cls, value, shift):
-        self.__value = value
-        self.__shift = shift
+        ret = super().__new__(cls)
+        ret.__value = value
+        ret.__shift = shift
+        return ret
+
+    def __init__(self, value, shift):
+        pass
 
     @property
     def _value(self):
@@ -1442,6 +3699,16 @@ class DiceBitwiseShift(Rollable, Parenthesize):
     def _shift(self):
         return self.__shift
 
+    def _children(self):
+        return rollables_of(self._value, self._shift)
+
+    @staticmethod
+    def _apply(value, shift):
+        if shift < 0:
+            return value << abs(shift)
+        else:
+            return value >> abs(shift)
+
     def _roll(self):
         try:
             value = self._value()
@@ -1453,10 +3720,25 @@ class DiceBitwiseShift(Rollable, Parenthesize):
         except TypeError:
             shift = self._shift
 
-        if shift < 0:
-            return value << abs(shift)
-        else:
-            return value >> abs(shift)
+        return self._apply(value, shift)
+
+    def _demand(self, count, demand):
+        demand_of(self._value, count, demand)
+        demand_of(self._shift, count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(
+            self._apply,
+            batch_of(self._value, count, faces),
+            batch_of(self._shift, count, faces)
+        ))
+
+    def _distribution(self, exact):
+        return _distribution.combine(
+            distribution_of(self._value, exact),
+            distribution_of(self._shift, exact),
+            self._apply
+        )
 
     def copy(self):
         try:
@@ -1471,18 +3753,27 @@ class DiceBitwiseShift(Rollable, Parenthesize):
 
         return DiceBitwiseShift(value, shift)
 
-    def __hash__(self):
-        return hash((type(self), self._value, self._shift))
+    def _structure(self):
+        return structure_of(type(self), self._value, self._shift)
 
     def __str__(self):
-        return (' << ' if int(self._shift) < 0 else ' >> ').join([
+        shift = self._shift
+        if isinstance(shift, Rollable):
+            left = isinstance(shift, DiceMultiplier) and shift.scalar < 0
+        else:
+            left = shift < 0
+
+        if left:
+            shift = -shift
+
+        return (' << ' if left else ' >> ').join([
             self._value.paren_str()
             if isinstance(self._value, Parenthesize)
             else str(self._value),
 
-            self._shift.paren_str()
-            if isinstance(abs(self._shift), Parenthesize)
-            else str(abs(self._shift))
+            shift.paren_str()
+            if isinstance(shift, Parenthesize)
+            else str(shift)
         ])
 
     def __repr__(self):
@@ -1514,14 +3805,29 @@ class DiceAbs(Rollable):
     def _element(self):
         return self.__element
 
+    def _children(self):
+        return (self._element,)
+
     def copy(self):
         return DiceAbs(self._element.copy())
 
     def _roll(self):
         return abs(self._element())
 
-    def __hash__(self):
-        return hash((type(self), self._element))
+    def _demand(self, count, demand):
+        self._element._demand(count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(abs, self._element._roll_batch(count, faces)))
+
+    def _distribution(self, exact):
+        return _distribution.transform(
+            self._element.distribution(exact),
+            abs
+        )
+
+    def _structure(self):
+        return structure_of(type(self), self._element)
 
     def __str__(self):
         return ''.join([
@@ -1552,14 +3858,29 @@ class DiceTrunc(Rollable):
     def _element(self):
         return self.__element
 
+    def _children(self):
+        return (self._element,)
+
     def copy(self):
         return DiceTrunc(self._element.copy())
 
     def _roll(self):
         return math.trunc(self._element())
 
-    def __hash__(self):
-        return hash((type(self), self._element))
+    def _demand(self, count, demand):
+        self._element._demand(count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(math.trunc, self._element._roll_batch(count, faces)))
+
+    def _distribution(self, exact):
+        return _distribution.transform(
+            self._element.distribution(exact),
+            math.trunc
+        )
+
+    def _structure(self):
+        return structure_of(type(self), self._element)
 
     def __str__(self):
         return ''.join([
@@ -1590,14 +3911,29 @@ class DiceFloor(Rollable):
     def _element(self):
         return self.__element
 
+    def _children(self):
+        return (self._element,)
+
     def copy(self):
         return DiceFloor(self._element.copy())
 
     def _roll(self):
         return math.floor(self._element())
 
-    def __hash__(self):
-        return hash((type(self), self._element))
+    def _demand(self, count, demand):
+        self._element._demand(count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(math.floor, self._element._roll_batch(count, faces)))
+
+    def _distribution(self, exact):
+        return _distribution.transform(
+            self._element.distribution(exact),
+            math.floor
+        )
+
+    def _structure(self):
+        return structure_of(type(self), self._element)
 
     def __str__(self):
         return ''.join([
@@ -1628,14 +3964,29 @@ class DiceCeil(Rollable):
     def _element(self):
         return self.__element
 
+    def _children(self):
+        return (self._element,)
+
     def copy(self):
         return DiceCeil(self._element.copy())
 
     def _roll(self):
         return math.ceil(self._element())
 
-    def __hash__(self):
-        return hash((type(self), self._element))
+    def _demand(self, count, demand):
+        self._element._demand(count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(math.ceil, self._element._roll_batch(count, faces)))
+
+    def _distribution(self, exact):
+        return _distribution.transform(
+            self._element.distribution(exact),
+            math.ceil
+        )
+
+    def _structure(self):
+        return structure_of(type(self), self._element)
 
     def __str__(self):
         return ''.join([
@@ -1661,13 +4012,16 @@ class DiceRound(Rollable):
 
         return ret
 
-    def __init__(self, element):
+    def __init__(self, element, ndigits=0):
         pass
 
     @property
     def _element(self):
         return self.__element
 
+    def _children(self):
+        return (self._element,)
+
     @property
     def _ndigits(self):
         return self.__ndigits
@@ -1678,8 +4032,23 @@ class DiceRound(Rollable):
     def _roll(self):
         return round(self._element(), self._ndigits)
 
-    def __hash__(self):
-        return hash((type(self), self._element, self._ndigits))
+    def _demand(self, count, demand):
+        self._element._demand(count, demand)
+
+    def _roll_batch(self, count, faces):
+        return [
+            round(value, self._ndigits)
+            for value in self._element._roll_batch(count, faces)
+        ]
+
+    def _distribution(self, exact):
+        return _distribution.transform(
+            self._element.distribution(exact),
+            lambda value: round(value, self._ndigits)
+        )
+
+    def _structure(self):
+        return structure_of(type(self), self._element, self._ndigits)
 
     def __str__(self):
         elems = [
@@ -1690,7 +4059,7 @@ class DiceRound(Rollable):
         if self._ndigits:
             elems += [str(self._ndigits)]
 
-        return ''.join(['random(', ', '.join(elems), ')'])
+        return ''.join(['round(', ', '.join(elems), ')'])
 
     def __repr__(self):
         return ''.join([
@@ -1704,43 +4073,24 @@ class DiceRound(Rollable):
 
 class DiceModulus(Rollable, Parenthesize):
     def __new__(cls, numerator, denominator):
-        if not denominator:
+        if not isinstance(denominator, Rollable) and not denominator:
             raise ZeroDivisionError
 
-        if isinstance(numerator, DiceModulus):
-            new_numerator = numerator.numerator
-            new_denominator = numerator.denominator
-
-        else:
-            new_numerator = numerator
-            new_denominator = 1
-
-        if isinstance(denominator, DiceModulus):
-            new_denominator *= denominator.numerator
-            new_numerator *= denominator.denominator
-
-        else:
-            new_denominator *= denominator
-
         if (
-            isinstance(numerator, (Dice, Die)) and
-            not isinstance(denominator, Rollable)
+            isinstance(numerator, Die) and
+            numerator.convention is standard_die and
+            not numerator.explode and
+            not numerator.reroll and
+            isinstance(denominator, numbers.Integral) and
+            not isinstance(denominator, Rollable) and
+            denominator > 1 and
+            not numerator.sides % denominator
         ):
-            if isinstance(numerator, Dice):
-                rolls = len(numerator)
-                sides = numerator.die.sides
-            else:
-                rolls = 1
-                sides = numerator.sides
-
-            if not sides % denominator:
-                sides = denominator
-                return Dice(rolls, Die(sides)) - 1
-
+            return Die(denominator) - 1
 
         ret = super().__new__(cls)
-        ret.__numerator = new_numerator
-        ret.__denominator = new_denominator
+        ret.__numerator = numerator
+        ret.__denominator = denominator
         return ret
 
     def __init__(self, numerator, denominator):
@@ -1754,6 +4104,9 @@ class DiceModulus(Rollable, Parenthesize):
     def denominator(self):
         return self.__denominator
 
+    def _children(self):
+        return rollables_of(self.numerator, self.denominator)
+
     def _roll(self):
         try:
             numerator = self.numerator()
@@ -1767,6 +4120,27 @@ class DiceModulus(Rollable, Parenthesize):
 
         return numerator % denominator
 
+    def _demand(self, count, demand):
+        demand_of(self.numerator, count, demand)
+        demand_of(self.denominator, count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(
+            operator.mod,
+            batch_of(self.numerator, count, faces),
+            batch_of(self.denominator, count, faces)
+        ))
+
+    def _distribution(self, exact):
+        if isinstance(self.denominator, Rollable):
+            return _distribution.combine(
+                distribution_of(self.numerator, exact),
+                self.denominator.distribution(exact),
+                operator.mod
+            )
+
+        return distribution_mod(self.numerator, self.denominator, exact)
+
     def copy(self):
         try:
             numerator = self.numerator.copy()
@@ -1780,8 +4154,8 @@ class DiceModulus(Rollable, Parenthesize):
 
         return DiceModulus(numerator, denominator)
 
-    def __hash__(self):
-        return hash(type(self), self.numerator, self.denominator)
+    def _structure(self):
+        return structure_of(type(self), self.numerator, self.denominator)
 
     def __str__(self):
         return ' % '.join([
@@ -1901,6 +4275,9 @@ class DicePower(Rollable, Parenthesize):
     def _exponent(self):
         return self.__exponent
 
+    def _children(self):
+        return rollables_of(self._base, self._exponent)
+
     def _roll(self):
         try:
             base = self._base()
@@ -1914,6 +4291,24 @@ class DicePower(Rollable, Parenthesize):
 
         return base ** exponent
 
+    def _demand(self, count, demand):
+        demand_of(self._base, count, demand)
+        demand_of(self._exponent, count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(
+            operator.pow,
+            batch_of(self._base, count, faces),
+            batch_of(self._exponent, count, faces)
+        ))
+
+    def _distribution(self, exact):
+        return _distribution.combine_sorted(
+            distribution_of(self._base, exact),
+            distribution_of(self._exponent, exact),
+            operator.pow
+        )
+
     def copy(self):
         try:
             base = self._base.copy()
@@ -1927,8 +4322,8 @@ class DicePower(Rollable, Parenthesize):
 
         return DicePower(base, exponent)
 
-    def __hash__(self):
-        return hash((type(self), self._base, self._exponent))
+    def _structure(self):
+        return structure_of(type(self), self._base, self._exponent)
 
     def __str__(self):
         return ' ** '.join([
@@ -1951,16 +4346,632 @@ class DicePower(Rollable, Parenthesize):
             ')'
         ])
 
+COMPARISONS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def value_of(item):
+    if isinstance(item, Rollable):
+        return item()
+
+    return item
+
+
+def copy_of(item):
+    if isinstance(item, Rollable):
+        return item.copy()
+
+    return item
+
+
+def str_of(item):
+    if isinstance(item, Parenthesize):
+        return item.paren_str()
+
+    return str(item)
+
+
+class DiceComparison(Rollable, Parenthesize):
+    """
+    A rollable object that compares two values, at least one of which is
+    rolled, giving True or False. The comparison operators of rollable objects
+    compare their last rolls straight away, so this is how a comparison is
+    built into an expression to be rolled later, such as the condition of a
+    :py:class:`DiceIf`.
+    """
+
+    def __new__(cls, left, comparison, right):
+        if comparison not in COMPARISONS:
+            raise ValueError(
+                ' '.join(['Unknown comparison:', repr(comparison)])
+            )
+
+        ret = super().__new__(cls)
+        ret.__left = copy_of(left)
+        ret.__comparison = comparison
+        ret.__right = copy_of(right)
+        return ret
+
+    def __init__(self, left, comparison, right):
+        pass
+
+    @property
+    def left(self):
+        return self.__left
+
+    @property
+    def comparison(self):
+        return self.__comparison
+
+    @property
+    def right(self):
+        return self.__right
+
+    def _children(self):
+        return rollables_of(self.left, self.right)
+
+    def _roll(self):
+        return COMPARISONS[self.comparison](
+            value_of(self.left),
+            value_of(self.right)
+        )
+
+    def _demand(self, count, demand):
+        demand_of(self.left, count, demand)
+        demand_of(self.right, count, demand)
+
+    def _roll_batch(self, count, faces):
+        return list(map(
+            COMPARISONS[self.comparison],
+            batch_of(self.left, count, faces),
+            batch_of(self.right, count, faces)
+        ))
+
+    def _distribution(self, exact):
+        return _distribution.combine(
+            distribution_of(self.left, exact),
+            distribution_of(self.right, exact),
+            COMPARISONS[self.comparison]
+        )
+
+    def copy(self):
+        return DiceComparison(self.left, self.comparison, self.right)
+
+    def _structure(self):
+        return structure_of(type(self), self.left, self.comparison, self.right)
+
+    def __str__(self):
+        return ' '.join([
+            str_of(self.left),
+            self.comparison,
+            str_of(self.right)
+        ])
+
+    def __repr__(self):
+        return ''.join([
+            'DiceComparison(',
+            ', '.join([
+                repr(self.left),
+                repr(self.comparison),
+                repr(self.right)
+            ]),
+            ')'
+        ])
+
+
+class DiceIf(Rollable, Parenthesize):
+    """
+    A rollable object that rolls its condition, and then rolls only one of its
+    two branches: then if the condition came up true, and otherwise if not.
+    So damage is only rolled for an attack that hits. When rolling in batches,
+    each branch is rolled once, for just the trials that take it. The
+    distribution is the mixture of the distributions of the two branches,
+    weighted by the chance of each.
+    """
+
+    def __new__(cls, condition, then, otherwise=0):
+        ret = super().__new__(cls)
+        ret.__condition = copy_of(condition)
+        ret.__then = copy_of(then)
+        ret.__otherwise = copy_of(otherwise)
+        return ret
+
+    def __init__(self, condition, then, otherwise=0):
+        pass
+
+    @property
+    def condition(self):
+        return self.__condition
+
+    @property
+    def then(self):
+        return self.__then
+
+    @property
+    def otherwise(self):
+        return self.__otherwise
+
+    def _children(self):
+        return rollables_of(self.condition, self.then, self.otherwise)
+
+    def _roll(self):
+        if value_of(self.condition):
+            return value_of(self.then)
+
+        return value_of(self.otherwise)
+
+    def _demand(self, count, demand):
+        demand_of(self.condition, count, demand)
+        demand_of(self.then, count, demand)
+        demand_of(self.otherwise, count, demand)
+
+    def _roll_batch(self, count, faces):
+        taken = batch_of(self.condition, count, faces)
+        ret = [None] * count
+        for branch, trials in (
+            (self.then, [index for index in range(count) if taken[index]]),
+            (
+                self.otherwise,
+                [index for index in range(count) if not taken[index]]
+            )
+        ):
+            if trials:
+                for index, value in zip(trials, batch_of(
+                    branch,
+                    len(trials),
+                    FacePoolView(faces, trials)
+                )):
+                    ret[index] = value
+
+        return ret
+
+    def _distribution(self, exact):
+        condition = _distribution.transform(
+            distribution_of(self.condition, exact),
+            bool
+        )
+        return _distribution.mixture(
+            condition,
+            [
+                distribution_of(self.then if taken else self.otherwise, exact)
+                for taken in condition.outcomes
+            ]
+        )
+
+    def copy(self):
+        return DiceIf(self.condition, self.then, self.otherwise)
+
+    def _structure(self):
+        return structure_of(
+            type(self),
+            self.condition,
+            self.then,
+            self.otherwise
+        )
+
+    def __str__(self):
+        return ' '.join([
+            str_of(self.then),
+            'if',
+            str_of(self.condition),
+            'else',
+            str_of(self.otherwise)
+        ])
+
+    def __repr__(self):
+        return ''.join([
+            'DiceIf(',
+            ', '.join([
+                repr(self.condition),
+                repr(self.then),
+                repr(self.otherwise)
+            ]),
+            ')'
+        ])
+
+
+def roll_batch(expressions, counts=None):
+    """
+    Rolls many rollable objects together in a single batch. Expressions that
+    are structurally identical are grouped together and rolled as one, and all
+    of the faces needed for every die of the same number of sides are drawn
+    with one call to the random number generator.
+    The results are then scattered back to match the requested expressions.
+
+    :param expressions: The rollable objects to roll.
+    :type expressions: iterable
+    :param counts: The number of times to roll each expression. If not given,
+        every expression is rolled once.
+    :type counts: iterable
+
+    :return: A list with an entry for each expression. If counts is given, each
+        entry is a list of the rolled values for that expression, otherwise it
+        is the single rolled value.
+    """
+
+    expressions = list(expressions)
+    single = counts is None
+    if single:
+        counts = [1] * len(expressions)
+    else:
+        counts = [int(count) for count in counts]
+
+    if len(counts) != len(expressions):
+        raise ValueError('There must be a count for every expression.')
+
+    groups = {}
+    for expression, count in zip(expressions, counts):
+        key = structure_of(expression)
+        if key in groups:
+            groups[key][1] += count
+        else:
+            groups[key] = [expression, count]
+
+    demand = collections.Counter()
+    for expression, total in groups.values():
+        demand_of(expression, total, demand)
+
+    faces = FacePool(sum(counts), demand)
+    results = {}
+    offset = 0
+    for key, (expression, total) in groups.items():
+        pool = faces
+        if isinstance(expression, Rollable) and expression._shared_nodes():
+            pool = FacePoolView(faces, range(offset, offset + total))
+
+        results[key] = iter(batch_of(expression, total, pool))
+        offset += total
+
+    ret = [
+        [next(results[structure_of(expression)]) for i in range(count)]
+        for expression, count in zip(expressions, counts)
+    ]
+    if single:
+        ret = [values[0] for values in ret]
+
+    return ret
+
+
+def contest_matrix(expressions, exact=False, executor=None):
+    """
+    Works out who beats whom among many independently rolled expressions,
+    without rolling any of them. Entry [i][j] of the wins matrix is the
+    probability that expression i rolls higher than expression j, and entry
+    [i][j] of the ties matrix is the probability that they roll the same.
+
+    :param expressions: The rollable objects (or numbers) to match up.
+    :type expressions: iterable
+    :param exact: If True, the probabilities are given as
+        :py:class:`fractions.Fraction`.
+    :type exact: bool
+    :param executor: An optional :py:class:`concurrent.futures.Executor`, such
+        as a process pool, to spread the rows of the matrices over.
+
+    :return: A tuple of the wins matrix and the ties matrix, each as a list of
+        rows.
+    """
+
+    return _distribution.contest(
+        [distribution_of(expression, exact) for expression in expressions],
+        executor
+    )
+
+
+SWEEP_STATS = {
+    'mean': lambda distribution: distribution.mean(),
+    'variance': lambda distribution: distribution.variance(),
+    'stdev': lambda distribution: math.sqrt(distribution.variance()),
+    'min': lambda distribution: min(distribution.outcomes),
+    'max': lambda distribution: max(distribution.outcomes),
+}
+
+
+def sweep(build, values, stats=None, exact=False):
+    """
+    Works out the distributions of a family of expressions, one for each of
+    the given parameter values, such as ``lambda n: Dice(n, d6) + 3`` over a
+    range of n. Distributions are kept in the distribution cache by the
+    structure of the object they belong to, so a part that does not change
+    between the steps is only worked out once, and the sum of n dice is made
+    from the sum of n - 1 of them with one more convolution when the steps go
+    up one die at a time.
+
+    :param build: A function taking a parameter value and returning the
+        rollable object (or number) for it.
+    :type build: callable
+    :param values: The parameter values, in the order to walk them.
+    :type values: iterable
+    :param stats: If given, the summary statistics to give for each step
+        rather than the probabilities. Each is either the name of one of
+        ``'mean'``, ``'variance'``, ``'stdev'``, ``'min'`` and ``'max'``, or a
+        function taking a :py:class:`Distribution`.
+    :type stats: iterable
+    :param exact: If True, the probabilities are given as
+        :py:class:`fractions.Fraction`.
+    :type exact: bool
+
+    :return: Without stats, a tuple of the sorted outcomes that any step can
+        roll and a list with a row for each step, giving the probability of
+        each of those outcomes. With stats, a list with a row for each step,
+        giving each of the statistics.
+    """
+
+    if stats is not None:
+        funcs = []
+        for stat in stats:
+            if isinstance(stat, str):
+                if stat not in SWEEP_STATS:
+                    raise ValueError(
+                        ' '.join(['Unknown statistic:', repr(stat)])
+                    )
+
+                stat = SWEEP_STATS[stat]
+
+            funcs.append(stat)
+
+    distributions = [distribution_of(build(value), exact) for value in values]
+    if stats is not None:
+        return [
+            [func(distribution) for func in funcs]
+            for distribution in distributions
+        ]
+
+    grid = sorted(set().union(
+        *(distribution.outcomes for distribution in distributions)
+    ))
+    return grid, [
+        [distribution.get(outcome, 0) for outcome in grid]
+        for distribution in distributions
+    ]
+
+
+def write_npy(file, rows):
+    """
+    Writes a table of numbers to a binary file in the NPY format, as a two
+    dimensional array of little-endian doubles that :py:func:`numpy.load` can
+    read.
+    """
+
+    rows = list(rows)
+    width = len(rows[0]) if rows else 0
+    header = ''.join([
+        "{'descr': '<f8', 'fortran_order': False, 'shape': (",
+        str(len(rows)),
+        ', ',
+        str(width),
+        '), }'
+    ])
+    header = header.ljust(64 * ((len(header) + 10 + 1) // 64 + 1) - 10 - 1)
+    header = ''.join([header, '\n']).encode('latin1')
+
+    values = array.array('d', (value for row in rows for value in row))
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    file.write(b'\x93NUMPY\x01\x00')
+    file.write(len(header).to_bytes(2, 'little'))
+    file.write(header)
+    values.tofile(file)
+
+
+def export_cdf(expressions, path, format='csv'):
+    """
+    Writes the cumulative distribution tables of many expressions to a single
+    file, all on one shared column of outcomes: the first column of each row is
+    the outcome, followed by the probability of each expression rolling no more
+    than it. Every distribution is worked out (or taken from its cache) once,
+    and each column is filled in one sweep of its running totals.
+
+    :param expressions: The rollable objects to export.
+    :type expressions: iterable
+    :param path: The path of the file to write.
+    :param format: ``'csv'`` for a text table with a header row naming the
+        expressions, or ``'npy'`` for a NumPy array file, which can only hold
+        expressions that roll real numbers.
+    :type format: str
+    """
+
+    if format not in {'csv', 'npy'}:
+        raise ValueError(' '.join(['Unknown export format:', repr(format)]))
+
+    expressions = list(expressions)
+    distributions = [
+        distribution_of(expression)
+        for expression in expressions
+    ]
+    if format == 'npy':
+        for expression, distribution in zip(expressions, distributions):
+            if not all(
+                isinstance(outcome, numbers.Real)
+                for outcome in distribution.outcomes
+            ):
+                raise ValueError(' '.join([
+                    'Only real outcomes can be written to an NPY file:',
+                    repr(expression)
+                ]))
+
+    grid = sorted(set().union(
+        *(distribution.outcomes for distribution in distributions)
+    ))
+    columns = [distribution.cdf(grid) for distribution in distributions]
+    rows = (
+        [outcome] + [column[index] for column in columns]
+        for index, outcome in enumerate(grid)
+    )
+
+    if format == 'csv':
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                ['outcome'] + [str(expression) for expression in expressions]
+            )
+            writer.writerows(rows)
+
+    else:
+        with open(path, 'wb') as file:
+            write_npy(file, rows)
+
+
+def set_cache_size(size):
+    DISTRIBUTIONS.budget = size
+    return DISTRIBUTIONS.budget
+
+
+def set_cache_policy(policy):
+    DISTRIBUTIONS.policy = policy
+    return DISTRIBUTIONS.policy
+
+
+def set_cache_path(path):
+    DISK_CACHE.path = path
+    return DISK_CACHE.path
+
+
+def set_pool_size(size):
+    WORKERS.size = size
+    return WORKERS.size
+
+
+def set_pool_type(kind):
+    WORKERS.kind = kind
+    return WORKERS.kind
+
+
 class DiceConfig(config.Base):
     def __init__(self):
         super().__init__()
 
+        self.register_attr(
+            'roll_batch',
+            lambda: roll_batch,
+            roll_batch.__doc__
+        )
+
+        self.register_attr(
+            'export_cdf',
+            lambda: export_cdf,
+            export_cdf.__doc__
+        )
+
+        self.register_attr(
+            'contest_matrix',
+            lambda: contest_matrix,
+            contest_matrix.__doc__
+        )
+
+        self.register_attr(
+            'sweep',
+            lambda: sweep,
+            sweep.__doc__
+        )
+
+        self.register_attr(
+            'cache',
+            lambda: DISTRIBUTIONS,
+            'The cache that distributions are shared in by structure.'
+        )
+
+        self.register_attr(
+            'cache_size',
+            set_cache_size,
+            'The most bytes that the distribution cache can take up.',
+            setable=True
+        )
+
+        self.register_attr(
+            'cache_policy',
+            set_cache_policy,
+            "The eviction policy of the distribution cache, 'lru' or 'lfu'.",
+            setable=True
+        )
+
+        self.register_attr(
+            'cache_path',
+            set_cache_path,
+            'The directory that distributions are kept in across processes.',
+            setable=True
+        )
+
+        self.register_attr(
+            'pool_size',
+            set_pool_size,
+            'The number of workers that big sums of dice are spread over.',
+            setable=True
+        )
+
+        self.register_attr(
+            'pool_type',
+            set_pool_type,
+            "The kind of workers big sums use, 'process' or 'thread'.",
+            setable=True
+        )
+
         self.register_attr(
             'd',
             lambda: Die,
             Die.__doc__
         )
 
+        self.register_attr(
+            'shared',
+            lambda: DiceShared,
+            DiceShared.__doc__
+        )
+
+        self.register_attr(
+            'compare',
+            lambda: DiceComparison,
+            DiceComparison.__doc__
+        )
+
+        self.register_attr(
+            'if_',
+            lambda: DiceIf,
+            DiceIf.__doc__
+        )
+
+        self.register_attr(
+            'pool',
+            lambda: DicePool,
+            DicePool.__doc__
+        )
+
+        self.register_attr(
+            'Convention',
+            lambda: Convention,
+            Convention.__doc__
+        )
+
+        self.register_attr(
+            'keep_highest',
+            lambda: keep_highest,
+            'Dice convention keeping the highest of the dice rolled.'
+        )
+
+        self.register_attr(
+            'keep_lowest',
+            lambda: keep_lowest,
+            'Dice convention keeping the lowest of the dice rolled.'
+        )
+
+        self.register_attr(
+            'drop_lowest',
+            lambda: drop_lowest,
+            'Dice convention dropping the lowest of the dice rolled.'
+        )
+
+        self.register_attr(
+            'drop_highest',
+            lambda: drop_highest,
+            'Dice convention dropping the highest of the dice rolled.'
+        )
+
         self.register_attr(
             'd2',
             lambda: Die(2),
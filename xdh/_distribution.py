@@ -0,0 +1,1445 @@
+"""
+Module providing exact probability distributions for rollable objects. A
+distribution is a read-only mapping of every possible outcome of a rollable
+object to the probability of that outcome, and the functions here combine the
+distributions of the pieces of a rollable object into the distribution of the
+whole.
+
+"""
+
+import bisect
+import collections
+import collections.abc
+import fractions
+import functools
+import heapq
+import itertools
+import math
+import numbers
+import operator
+import random
+import sys
+
+DENSE_DENSITY = 0.5
+
+APPROXIMATE_WIDTH = 10
+
+BERRY_ESSEEN = 0.56
+
+PARALLEL_WORK = 10 ** 5
+
+DenseParts = collections.namedtuple(
+    'DenseParts',
+    ['offset', 'length', 'total', 'error', 'parts']
+)
+
+
+class Distribution(collections.abc.Mapping):
+    """
+    The exact probability distribution of the outcomes of a rollable object.
+    This acts like a read-only dict mapping each possible outcome to its
+    probability, with the outcomes kept in sorted order.
+
+    The outcomes and weights are stored sparsely, as sorted tuples, so that
+    distributions with scattered outcomes (like products of dice) only take up
+    room for the outcomes that can actually happen. Distributions of integers
+    that fill most of their range can also be laid out densely, as an offset
+    and a list of weights, which is what sums of dice use.
+
+    Each weight is the share of the total that goes to its outcome. Normally
+    the total is 1 and the weights are float probabilities, but an exact
+    distribution keeps integer counts of the ways each outcome can come up,
+    out of a total that is the number of ways the dice can land, and its
+    probabilities come out as :py:class:`fractions.Fraction` with no rounding.
+    """
+
+    @classmethod
+    def from_sorted(cls, outcomes, weights, total=1, error=0):
+        """
+        Builds a distribution from outcomes that are already sorted and unique,
+        skipping any with no weight.
+        """
+
+        ret = cls.__new__(cls)
+        items = [
+            (outcome, weight)
+            for outcome, weight in zip(outcomes, weights)
+            if weight
+        ]
+        ret.__outcomes = tuple(outcome for outcome, weight in items)
+        ret.__weights = tuple(weight for outcome, weight in items)
+        ret.__total = total
+        ret.__error = error
+        return ret
+
+    @classmethod
+    def from_tables(cls, outcomes, weights, total=1, error=0):
+        """
+        Builds a distribution from sequences of outcomes that are already
+        sorted and unique, and their weights, none of which are 0. The
+        sequences are kept as they are rather than copied, so they can be views
+        of memory that is shared with other processes.
+        """
+
+        ret = cls.__new__(cls)
+        ret.__outcomes = outcomes
+        ret.__weights = weights
+        ret.__total = total
+        ret.__error = error
+        return ret
+
+    def __init__(self, weights, total=1, error=0):
+        items = sorted(
+            (outcome, weight)
+            for outcome, weight in dict(weights).items()
+            if weight
+        )
+        self.__outcomes = tuple(outcome for outcome, weight in items)
+        self.__weights = tuple(weight for outcome, weight in items)
+        self.__total = total
+        self.__error = error
+
+    @property
+    def outcomes(self):
+        return self.__outcomes
+
+    @property
+    def __positions(self):
+        try:
+            return self.__index
+
+        except AttributeError:
+            self.__index = {
+                outcome: index
+                for index, outcome in enumerate(self.__outcomes)
+            }
+            return self.__index
+
+    @property
+    def weights(self):
+        return self.__weights
+
+    @property
+    def total(self):
+        return self.__total
+
+    @property
+    def error(self):
+        """
+        A bound on how far the :py:meth:`cdf` of this distribution can be from
+        the true one at any threshold. This is 0 unless the distribution is an
+        approximation, or was built from one.
+        """
+
+        return self.__error
+
+    @property
+    def exact(self):
+        """
+        Whether the weights are integer counts out of an integer total, so
+        that the probabilities can be given exactly.
+        """
+
+        try:
+            return self.__exact
+
+        except AttributeError:
+            self.__exact = isinstance(self.__total, numbers.Integral) and all(
+                isinstance(weight, numbers.Integral)
+                for weight in self.__weights
+            )
+            return self.__exact
+
+    @property
+    def probabilities(self):
+        """
+        The probability of each outcome, in the same order as the outcomes.
+        """
+
+        if self.__total == 1:
+            return self.__weights
+
+        return tuple(
+            true_divide(weight, self.__total)
+            for weight in self.__weights
+        )
+
+    def __getitem__(self, outcome):
+        return true_divide(
+            self.__weights[self.__positions[outcome]],
+            self.__total
+        )
+
+    def weight(self, outcome, default=0):
+        """
+        The weight of the given outcome, or the default if it cannot happen.
+        """
+
+        try:
+            return self.__weights[self.__positions[outcome]]
+
+        except KeyError:
+            return default
+
+    @property
+    def density(self):
+        """
+        The fraction of the integers between the lowest and highest outcomes
+        that are possible outcomes, or 0 if the outcomes are not all integers.
+        """
+
+        try:
+            return self.__density
+
+        except AttributeError:
+            pass
+
+        outcomes = self.__outcomes
+        if outcomes and all(
+            isinstance(outcome, numbers.Integral)
+            for outcome in outcomes
+        ):
+            self.__density = len(outcomes) / (outcomes[-1] - outcomes[0] + 1)
+        else:
+            self.__density = 0
+
+        return self.__density
+
+    @property
+    def dense(self):
+        """
+        The distribution laid out densely, as the lowest outcome and a list of
+        the weights of every integer from there up to the highest outcome.
+        """
+
+        if not self.density:
+            raise ValueError('Only integer outcomes can be laid out densely.')
+
+        offset = self.__outcomes[0]
+        ret = [0] * (self.__outcomes[-1] - offset + 1)
+        for outcome, weight in zip(self.__outcomes, self.__weights):
+            ret[outcome - offset] = weight
+
+        return offset, ret
+
+    def __iter__(self):
+        return iter(self.__outcomes)
+
+    def __len__(self):
+        return len(self.__outcomes)
+
+    def __contains__(self, outcome):
+        return outcome in self.__positions
+
+    @property
+    def truncated(self):
+        """
+        The probability that was left out of this distribution, for instance
+        because an exploding die was only followed to a limited depth.
+        """
+
+        if self.exact:
+            return 1 - fractions.Fraction(sum(self.__weights), self.__total)
+
+        return 1 - math.fsum(self.__weights) / self.__total
+
+    @property
+    def cumulative(self):
+        """
+        The running totals of the weights, from the lowest outcome up to each
+        outcome, and from each outcome up to the highest, as a pair of tuples.
+        The upper totals are summed separately rather than taken away from the
+        whole, so that small tail probabilities keep their precision.
+        """
+
+        try:
+            return self.__cumulative
+
+        except AttributeError:
+            pass
+
+        lower = tuple(itertools.accumulate(self.__weights))
+        upper = tuple(itertools.accumulate(reversed(self.__weights)))
+        self.__cumulative = (lower, upper[::-1])
+        return self.__cumulative
+
+    def __tail(self, thresholds, func):
+        if isinstance(thresholds, numbers.Real):
+            return func(thresholds)
+
+        return [func(threshold) for threshold in thresholds]
+
+    def __at_most(self, threshold):
+        index = bisect.bisect_right(self.__outcomes, threshold)
+        if not index:
+            return 0
+
+        return true_divide(self.cumulative[0][index - 1], self.__total)
+
+    def __above(self, threshold):
+        index = bisect.bisect_right(self.__outcomes, threshold)
+        if index == len(self.__outcomes):
+            return 0
+
+        return true_divide(self.cumulative[1][index], self.__total)
+
+    def cdf(self, thresholds):
+        """
+        The probability of an outcome no greater than the threshold. Given an
+        iterable of thresholds, this gives a list of the probabilities for
+        each of them, all read from the same running totals.
+        """
+
+        return self.__tail(thresholds, self.__at_most)
+
+    def sf(self, thresholds):
+        """
+        The probability of an outcome greater than the threshold, or a list of
+        them for an iterable of thresholds. Any truncated probability is not
+        counted, so this is not always one minus the :py:meth:`cdf`.
+        """
+
+        return self.__tail(thresholds, self.__above)
+
+    def __quantile(self, probability):
+        if not 0 <= probability <= 1:
+            raise ValueError('Quantiles must be between 0 and 1.')
+
+        index = bisect.bisect_left(
+            self.cumulative[0],
+            probability * self.__total
+        )
+        return self.__outcomes[min(index, len(self.__outcomes) - 1)]
+
+    def quantile(self, probabilities):
+        """
+        The lowest outcome whose :py:meth:`cdf` reaches the given probability,
+        found by a binary search of the running totals. Given an iterable of
+        probabilities, this gives a list of the quantiles for each of them. If
+        the probability is more than the distribution covers, because some was
+        truncated, the highest outcome is given.
+        """
+
+        return self.__tail(probabilities, self.__quantile)
+
+    def expect(self, func, vectorized=False):
+        """
+        The expected value of func applied to the outcome, calling func once
+        for each possible outcome. If vectorized is set, func is instead called
+        once with the tuple of all of the outcomes, and must give back a
+        sequence of the results in the same order.
+        """
+
+        if vectorized:
+            values = func(self.__outcomes)
+        else:
+            values = map(func, self.__outcomes)
+
+        return true_divide(
+            sum(
+                value * weight
+                for value, weight in zip(values, self.__weights)
+            ),
+            self.__total
+        )
+
+    def map(self, func):
+        """
+        The distribution of func applied to the outcome.
+        """
+
+        return transform(self, func)
+
+    def mean(self):
+        return true_divide(
+            sum(
+                outcome * weight
+                for outcome, weight in zip(self.__outcomes, self.__weights)
+            ),
+            self.__total
+        )
+
+    def variance(self):
+        mean = self.mean()
+        return true_divide(
+            sum(
+                (outcome - mean) ** 2 * weight
+                for outcome, weight in zip(self.__outcomes, self.__weights)
+            ),
+            self.__total
+        )
+
+    @property
+    def alias_table(self):
+        """
+        Walker's alias table for the distribution, as a tuple of the chance of
+        keeping each outcome and a tuple of the outcome index to use instead.
+        """
+
+        try:
+            return self.__alias_table
+
+        except AttributeError:
+            pass
+
+        count = len(self.__weights)
+        if self.exact:
+            total = sum(self.__weights)
+        else:
+            total = math.fsum(self.__weights)
+
+        scaled = [weight * count / total for weight in self.__weights]
+        keep = [1.0] * count
+        alias = list(range(count))
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            keep[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+        self.__alias_table = (tuple(keep), tuple(alias))
+        return self.__alias_table
+
+    def sample(self, count):
+        """
+        Draws count independent outcomes from the distribution, using the alias
+        method so that every draw costs the same no matter how many outcomes
+        there are.
+        """
+
+        keep, alias = self.alias_table
+        outcomes = self.__outcomes
+        return [
+            outcomes[index if coin < keep[index] else alias[index]]
+            for index, coin in zip(
+                random.choices(range(len(outcomes)), k=count),
+                (random.random() for i in range(count))
+            )
+        ]
+
+    def __sizeof__(self):
+        ret = object.__sizeof__(self)
+        try:
+            ret += sys.getsizeof(self.__index)
+
+        except AttributeError:
+            pass
+
+        tables = [self.__outcomes, self.__weights]
+        try:
+            tables.extend(self.__cumulative)
+
+        except AttributeError:
+            pass
+
+        try:
+            tables.extend(self.__alias_table)
+
+        except AttributeError:
+            pass
+
+        for table in tables:
+            ret += sizeof_table(table)
+
+        return ret
+
+    def __repr__(self):
+        return ''.join([
+            'Distribution({',
+            ', '.join(
+                ': '.join([repr(outcome), repr(weight)])
+                for outcome, weight in zip(self.__outcomes, self.__weights)
+            ),
+            '}',
+            '' if self.__total == 1 else ''.join([
+                ', total=',
+                repr(self.__total)
+            ]),
+            ')'
+        ])
+
+
+def sizeof_table(values):
+    """
+    An estimate of the bytes taken up by a tuple of numbers and the numbers in
+    it, taken from a few of the numbers rather than every one of them. Other
+    sequences, such as views of mapped files, only count their own size.
+    """
+
+    ret = sys.getsizeof(values)
+    if isinstance(values, tuple) and values:
+        ret += len(values) * max(
+            sys.getsizeof(values[index])
+            for index in (0, len(values) // 2, -1)
+        )
+
+    return ret
+
+
+def uniform(outcomes, exact=False):
+    """
+    Builds the distribution where each of the given outcomes is equally likely.
+    Outcomes that appear more than once are proportionally more likely. If
+    exact is set, the weights are the counts of each outcome out of the number
+    of outcomes given.
+    """
+
+    counts = collections.Counter(outcomes)
+    total = sum(counts.values())
+    if exact:
+        return Distribution(counts, total)
+
+    return Distribution({
+        outcome: count / total
+        for outcome, count in counts.items()
+    })
+
+
+def spread(values):
+    """
+    How many times over an error in the cdf of a distribution can show up in
+    the cdf of what a function maps its outcomes to, given the values that
+    the sorted outcomes are mapped to. Where the values only rise or only
+    fall, the outcomes mapped to at most any threshold are all at one end,
+    and the error carries over as it is. Otherwise they can fall into one
+    more piece for every two turns, and each piece can be off at both ends.
+    """
+
+    turns = 0
+    direction = 0
+    for previous, value in zip(values, values[1:]):
+        step = (value > previous) - (value < previous)
+        if step and direction and step != direction:
+            turns += 1
+
+        if step:
+            direction = step
+
+    if not turns:
+        return 1
+
+    return 2 * (turns // 2 + 1)
+
+
+def carried_error(*errors):
+    """
+    The bound on the error of a distribution built from others, given the
+    bounds that each of them adds, which is their sum, but never more than 1.
+    """
+
+    return min(math.fsum(errors), 1)
+
+
+def point(outcome):
+    return Distribution({outcome: 1})
+
+
+def negate(distribution):
+    """
+    The distribution of the negated outcomes of the given distribution.
+    """
+
+    return Distribution.from_sorted(
+        [-outcome for outcome in reversed(distribution.outcomes)],
+        distribution.weights[::-1],
+        distribution.total,
+        distribution.error
+    )
+
+
+def difference(left, right):
+    """
+    The distribution of ``x - y`` where x and y are independently drawn from
+    the left and right distributions, found by convolving the left
+    distribution with the negated right one.
+    """
+
+    return combine(left, negate(right))
+
+
+def to_float(distribution):
+    """
+    Turns the weights of a distribution into float probabilities out of a
+    total of 1.
+    """
+
+    return Distribution.from_sorted(
+        distribution.outcomes,
+        [
+            weight / distribution.total
+            for weight in distribution.weights
+        ],
+        error=distribution.error
+    )
+
+
+def transform(distribution, func):
+    """
+    Pushes a distribution through a function, collecting the probability of
+    every outcome that the function maps to the same value. Any error of the
+    distribution is carried over, as far as :py:func:`spread` allows.
+    """
+
+    weights = collections.defaultdict(int)
+    values = []
+    for outcome, weight in zip(distribution.outcomes, distribution.weights):
+        value = func(outcome)
+        weights[value] += weight
+        values.append(value)
+
+    error = 0
+    if distribution.error:
+        error = carried_error(distribution.error * spread(values))
+
+    return Distribution(weights, distribution.total, error)
+
+
+def mixture(chooser, parts):
+    """
+    The distribution of drawing from one of the parts, picked by a draw from
+    the chooser distribution, where parts[i] is drawn from when the chooser
+    gives its i-th outcome. The parts are brought to a common total first, so
+    exact parts stay exact.
+
+    The error is the average error of the parts, and any error of the chooser
+    can show up once for every part.
+    """
+
+    totals = [part.total for part in parts]
+    if all(isinstance(total, numbers.Integral) for total in totals):
+        common = math.lcm(*totals)
+    else:
+        common = 1
+
+    weights = collections.defaultdict(int)
+    for weight, part in zip(chooser.weights, parts):
+        if isinstance(common, numbers.Integral) and common % part.total == 0:
+            scale = weight * (common // part.total)
+        else:
+            scale = weight * common / part.total
+
+        for outcome, part_weight in zip(part.outcomes, part.weights):
+            weights[outcome] += scale * part_weight
+
+    error = carried_error(
+        chooser.error * len(parts),
+        *(
+            true_divide(weight, chooser.total) * part.error
+            for weight, part in zip(chooser.weights, parts)
+            if part.error
+        )
+    )
+    return Distribution(weights, chooser.total * common, error)
+
+
+def true_divide(numerator, denominator):
+    """
+    True division that stays exact, giving a :py:class:`fractions.Fraction`
+    when both sides are rational.
+    """
+
+    if (
+        isinstance(numerator, numbers.Rational) and
+        isinstance(denominator, numbers.Rational)
+    ):
+        return fractions.Fraction(numerator, denominator)
+
+    return numerator / denominator
+
+
+def combine(left, right, func=operator.add):
+    """
+    The distribution of ``func(x, y)`` where x and y are independently drawn
+    from the left and right distributions. Sums of densely packed integer
+    distributions are done on their dense layouts, and everything else on the
+    sparse outcomes. The error is found by :py:func:`combined_error`.
+    """
+
+    if (
+        func is operator.add and
+        left.density >= DENSE_DENSITY and
+        right.density >= DENSE_DENSITY
+    ):
+        return dense_convolve(left, right)
+
+    weights = collections.defaultdict(int)
+    for loutcome, lweight in zip(left.outcomes, left.weights):
+        for routcome, rweight in zip(right.outcomes, right.weights):
+            weights[func(loutcome, routcome)] += lweight * rweight
+
+    return Distribution(
+        weights,
+        left.total * right.total,
+        combined_error(left, right, func)
+    )
+
+
+def combined_error(left, right, func):
+    """
+    The bound on the error of the distribution of ``func(x, y)``, for
+    independent draws from the left and right distributions. Swapping in the
+    true distribution of one side at a time, the error of each side shows up
+    as many times over as :py:func:`spread` gives for func with the other side
+    held at any of its outcomes, which for sums is once.
+    """
+
+    if not left.error and not right.error:
+        return 0
+
+    if func is operator.add:
+        return carried_error(left.error, right.error)
+
+    errors = []
+    if left.error:
+        errors.append(left.error * max(
+            spread([func(loutcome, routcome) for loutcome in left.outcomes])
+            for routcome in right.outcomes
+        ))
+
+    if right.error:
+        errors.append(right.error * max(
+            spread([func(loutcome, routcome) for routcome in right.outcomes])
+            for loutcome in left.outcomes
+        ))
+
+    return carried_error(*errors)
+
+
+def dense_convolve(left, right):
+    """
+    The distribution of the sum of independent draws from two integer
+    distributions, computed on their dense layouts by adding a scaled copy of
+    one list into the result for every weight of the other.
+    """
+
+    loffset, lweights = left.dense
+    roffset, rweights = right.dense
+    if len(lweights) > len(rweights):
+        lweights, rweights = rweights, lweights
+
+    return Distribution.from_sorted(
+        itertools.count(loffset + roffset),
+        dense_sum(lweights, rweights),
+        left.total * right.total,
+        carried_error(left.error, right.error)
+    )
+
+
+def dense_sum(lweights, rweights):
+    """
+    The dense weights of the sum of two dense layouts, as a list that starts
+    at the sum of their offsets.
+    """
+
+    size = len(rweights)
+    ret = [0] * (len(lweights) + size - 1)
+    for index, weight in enumerate(lweights):
+        if weight:
+            ret[index:index + size] = map(
+                operator.add,
+                ret[index:index + size],
+                map(functools.partial(operator.mul, weight), rweights)
+            )
+
+    return ret
+
+
+def modular_sum(modulus, left, right):
+    return (left + right) % modulus
+
+
+def combine_sorted(left, right, func):
+    """
+    The distribution of ``func(x, y)`` for independent draws, built by merging
+    sorted runs rather than hashing every pair. For each outcome of the left
+    distribution, the results over the right distribution form a run that is
+    usually already in order (as with products and powers), and the runs are
+    merged, adding together the weights of equal results as they come out.
+    This suits scattered outcomes, as it never lays out the whole range.
+    """
+
+    runs = []
+    for loutcome, lweight in zip(left.outcomes, left.weights):
+        run = [
+            (func(loutcome, routcome), lweight * rweight)
+            for routcome, rweight in zip(right.outcomes, right.weights)
+        ]
+        if any(
+            first[0] > second[0]
+            for first, second in zip(run, run[1:])
+        ):
+            if all(
+                first[0] >= second[0]
+                for first, second in zip(run, run[1:])
+            ):
+                run.reverse()
+            else:
+                run.sort(key=operator.itemgetter(0))
+
+        runs.append(run)
+
+    outcomes = []
+    weights = []
+    for outcome, items in itertools.groupby(
+        heapq.merge(*runs, key=operator.itemgetter(0)),
+        key=operator.itemgetter(0)
+    ):
+        outcomes.append(outcome)
+        weights.append(sum(weight for outcome, weight in items))
+
+    return Distribution.from_sorted(
+        outcomes,
+        weights,
+        left.total * right.total,
+        combined_error(left, right, func)
+    )
+
+
+def multiply(left, right):
+    """
+    The distribution of the product of independent draws from the left and
+    right distributions.
+    """
+
+    return combine_sorted(left, right, operator.mul)
+
+
+def convolve(*distributions, modulus=None, executor=None, workers=1):
+    """
+    The distribution of the sum of independent draws from each of the given
+    distributions. If a modulus is given, the sum wraps around it, so the
+    distributions only ever cover the remainders.
+
+    Without an executor the distributions are added in one at a time. Given
+    a :py:mod:`concurrent.futures` executor with the given number of workers,
+    they are added up in a balanced tree instead, each level of which is a
+    batch of independent sums that the workers share. Levels with fewer sums
+    than workers, like the last one, split their dense sums into slices so
+    that every worker still has a part to do. Sums of less than
+    PARALLEL_WORK pairs of outcomes are quicker to do in place than to send,
+    and always are.
+    """
+
+    func = operator.add
+    if modulus is not None:
+        func = functools.partial(modular_sum, modulus)
+
+    if executor is None or len(distributions) < 2:
+        return functools.reduce(
+            functools.partial(combine, func=func),
+            distributions,
+            point(0)
+        )
+
+    level = list(distributions)
+    while len(level) > 1:
+        pairs = list(zip(level[0::2], level[1::2]))
+        ret = combine_on(executor, pairs, func, max(1, workers // len(pairs)))
+        if len(level) % 2:
+            ret.append(level[-1])
+
+        level = ret
+
+    return level[0]
+
+
+def combine_on(executor, pairs, func, split):
+    """
+    Combines each of the pairs of distributions with ``func`` on the executor,
+    splitting each dense sum into up to split slices of its shorter side.
+    """
+
+    pending = []
+    for left, right in pairs:
+        if len(left) * len(right) < PARALLEL_WORK:
+            pending.append(combine(left, right, func))
+
+        elif (
+            split > 1 and
+            func is operator.add and
+            left.density >= DENSE_DENSITY and
+            right.density >= DENSE_DENSITY
+        ):
+            loffset, lweights = left.dense
+            roffset, rweights = right.dense
+            if len(lweights) > len(rweights):
+                lweights, rweights = rweights, lweights
+
+            step = -(-len(lweights) // split)
+            pending.append(DenseParts(
+                loffset + roffset,
+                len(lweights) + len(rweights) - 1,
+                left.total * right.total,
+                carried_error(left.error, right.error),
+                [
+                    (
+                        start,
+                        executor.submit(
+                            dense_sum,
+                            lweights[start:start + step],
+                            rweights
+                        )
+                    )
+                    for start in range(0, len(lweights), step)
+                ]
+            ))
+
+        else:
+            pending.append(executor.submit(combine, left, right, func))
+
+    ret = []
+    for item in pending:
+        if isinstance(item, Distribution):
+            ret.append(item)
+
+        elif isinstance(item, DenseParts):
+            weights = [0] * item.length
+            for start, part in item.parts:
+                part = part.result()
+                weights[start:start + len(part)] = map(
+                    operator.add,
+                    weights[start:start + len(part)],
+                    part
+                )
+
+            ret.append(Distribution.from_sorted(
+                itertools.count(item.offset),
+                weights,
+                item.total,
+                item.error
+            ))
+
+        else:
+            ret.append(item.result())
+
+    return ret
+
+
+def convolve_power(distribution, num, modulus=None):
+    """
+    The distribution of the sum of num independent draws from the same
+    distribution, found by repeated squaring. If a modulus is given, the sum
+    wraps around it.
+    """
+
+    func = operator.add
+    if modulus is not None:
+        func = lambda left, right: (left + right) % modulus
+
+    ret = point(0)
+    while num:
+        if num & 1:
+            ret = combine(ret, distribution, func)
+
+        num >>= 1
+        if num:
+            distribution = combine(distribution, distribution, func)
+
+    return ret
+
+
+def explode(first, rest, trigger, depth, value=None, truncate=False):
+    """
+    The distribution of an exploding roll, where rolling the trigger face rolls
+    again and adds the next roll on, up to depth further rolls. The first roll
+    is drawn from the first distribution and every further roll from the rest
+    distribution, with value mapping each face to what it is worth.
+
+    If truncate is set, rolling the trigger face on the last allowed roll is
+    left out of the distribution rather than being counted, so that the
+    probability of exploding past the depth is reported as truncated mass.
+
+    Each roll that does not explode stands for every way the following rolls
+    could have gone, so its weight is scaled up by their total, keeping the
+    weights of the whole distribution over one common total.
+    """
+
+    if value is None:
+        value = lambda face: face
+
+    def step(rolls, following):
+        weights = collections.defaultdict(int)
+        for face, weight in zip(rolls.outcomes, rolls.weights):
+            if face != trigger:
+                weights[value(face)] += weight * following.total
+
+        triggered = rolls.weight(trigger)
+        for outcome, weight in zip(following.outcomes, following.weights):
+            weights[value(trigger) + outcome] += triggered * weight
+
+        return Distribution(weights, rolls.total * following.total)
+
+    if not depth:
+        return transform(first, value)
+
+    if truncate:
+        ret = transform(
+            Distribution({
+                face: weight
+                for face, weight in zip(rest.outcomes, rest.weights)
+                if face != trigger
+            }, rest.total),
+            value
+        )
+    else:
+        ret = transform(rest, value)
+
+    for level in range(depth - 1):
+        ret = step(rest, ret)
+
+    return step(first, ret)
+
+
+def cumulants(distribution):
+    """
+    The first four cumulants of a distribution (the mean, the variance, and the
+    third and fourth cumulants), followed by its third absolute central moment,
+    as floats. The cumulants of a sum of independent draws are the sums of the
+    cumulants of the draws, and so are the absolute moments that bound the
+    error of approximating the sum by a normal distribution.
+    """
+
+    probabilities = to_float(distribution).weights
+    outcomes = distribution.outcomes
+    mean = math.fsum(
+        outcome * probability
+        for outcome, probability in zip(outcomes, probabilities)
+    )
+    moments = [
+        math.fsum(
+            (outcome - mean) ** power * probability
+            for outcome, probability in zip(outcomes, probabilities)
+        )
+        for power in (2, 3, 4)
+    ]
+    absolute = math.fsum(
+        abs(outcome - mean) ** 3 * probability
+        for outcome, probability in zip(outcomes, probabilities)
+    )
+    return (
+        mean,
+        moments[0],
+        moments[1],
+        moments[2] - 3 * moments[0] ** 2,
+        absolute
+    )
+
+
+def lattice(distribution):
+    """
+    The lowest outcome, highest outcome and the step between outcomes of an
+    integer distribution, where every outcome is the lowest plus a multiple of
+    the step. Gives None if the outcomes are not all integers.
+    """
+
+    if not distribution.density:
+        return None
+
+    outcomes = distribution.outcomes
+    return (
+        outcomes[0],
+        outcomes[-1],
+        functools.reduce(
+            math.gcd,
+            (outcome - outcomes[0] for outcome in outcomes),
+            0
+        ) or 1
+    )
+
+
+def approximate(cumulants, lattice, edgeworth=True):
+    """
+    An approximation of the distribution of a sum of many independent draws,
+    given its cumulants (as from :py:func:`cumulants`) and the lattice that its
+    outcomes lie on (as from :py:func:`lattice`).
+
+    The cumulative distribution is approximated by the normal distribution
+    with the same mean and variance, read half a step either side of each
+    point of the lattice. With edgeworth set, it is corrected for the skewness
+    and excess kurtosis with the first two Edgeworth terms. Only the outcomes
+    within APPROXIMATE_WIDTH standard deviations of the mean are kept.
+
+    The error of the result is the Berry-Esseen bound on how far the normal
+    cumulative distribution can be from the true one, ``C * rho / sigma**3``,
+    where rho is the sum of the third absolute central moments of the draws
+    and C is the constant for independent draws that are not identically
+    distributed. The Edgeworth correction is usually far more accurate than
+    this, but has no simple guaranteed bound of its own.
+    """
+
+    mean, variance, third, fourth, absolute = cumulants
+    low, high, step = lattice
+    if variance <= 0:
+        return point(low)
+
+    sigma = math.sqrt(variance)
+    skew = third / sigma ** 3
+    kurtosis = fourth / variance ** 2
+
+    def cdf(value):
+        z = (value - mean) / sigma
+        ret = (1 + math.erf(z / math.sqrt(2))) / 2
+        if edgeworth:
+            ret -= math.exp(-z * z / 2) / math.sqrt(2 * math.pi) * (
+                skew / 6 * (z ** 2 - 1) +
+                kurtosis / 24 * (z ** 3 - 3 * z) +
+                skew ** 2 / 72 * (z ** 5 - 10 * z ** 3 + 15 * z)
+            )
+
+        return min(max(ret, 0), 1)
+
+    last = (high - low) // step
+    start = max(0, math.floor((mean - APPROXIMATE_WIDTH * sigma - low) / step))
+    stop = min(
+        last,
+        math.ceil((mean + APPROXIMATE_WIDTH * sigma - low) / step)
+    )
+    outcomes = range(low + start * step, low + (stop + 1) * step, step)
+    bounds = [cdf(outcome - step / 2) for outcome in outcomes]
+    bounds.append(cdf(outcomes[-1] + step / 2))
+    if start == 0:
+        bounds[0] = 0
+
+    if stop == last:
+        bounds[-1] = 1
+
+    return Distribution.from_sorted(
+        outcomes,
+        [max(upper - lower, 0) for lower, upper in zip(bounds, bounds[1:])],
+        error=min(BERRY_ESSEEN * absolute / sigma ** 3, 1)
+    )
+
+
+def multinomial(distribution, num):
+    """
+    The distribution of the sum of num independent draws from a distribution
+    with only a few outcomes, such as the success count of a single die in a
+    pool. This uses the multinomial closed form, weighting every way of
+    splitting the draws between the outcomes by the number of orderings of that
+    split, which for two outcomes is the binomial distribution. Any error of
+    the distribution carries over once for every draw.
+    """
+
+    outcomes = distribution.outcomes
+    weights = distribution.weights
+    ret = collections.defaultdict(int)
+
+    def split(index, remaining, total, weight):
+        if index == len(outcomes) - 1:
+            ret[total + outcomes[index] * remaining] += (
+                weight * weights[index] ** remaining
+            )
+            return
+
+        for count in range(remaining + 1):
+            split(
+                index + 1,
+                remaining - count,
+                total + outcomes[index] * count,
+                weight * math.comb(remaining, count) * weights[index] ** count
+            )
+
+    if outcomes:
+        split(0, num, 0, 1)
+
+    return Distribution(
+        ret,
+        distribution.total ** num,
+        carried_error(num * distribution.error)
+    )
+
+
+def walsh_hadamard(values):
+    """
+    In-place fast Walsh-Hadamard transform of a list whose length is a power
+    of two.
+    """
+
+    step = 1
+    while step < len(values):
+        for start in range(0, len(values), step * 2):
+            for index in range(start, start + step):
+                left = values[index]
+                right = values[index + step]
+                values[index] = left + right
+                values[index + step] = left - right
+
+        step *= 2
+
+
+def subset_sum(values, supersets=False, inverse=False):
+    """
+    In-place zeta transform of a list indexed by bit masks, replacing each
+    entry with the sum over all of its subsets (or supersets). With inverse
+    set, this is the Mobius transform that undoes it.
+    """
+
+    bit = 1
+    while bit < len(values):
+        for mask in range(len(values)):
+            if bool(mask & bit) != supersets:
+                other = mask ^ bit
+                if inverse:
+                    values[mask] -= values[other]
+                else:
+                    values[mask] += values[other]
+
+        bit <<= 1
+
+
+def bitwise(distributions, func, scalar):
+    """
+    The distribution of combining independent draws from each of the
+    distributions, and the scalar, with a bitwise and, or, or exclusive or.
+
+    When every outcome is a non-negative integer of at most B bits, each
+    distribution is laid out as a list over all 2**B bit patterns and moved
+    into a transformed space where the bitwise operation becomes pointwise
+    multiplication: the Walsh-Hadamard transform for exclusive or, and the
+    superset or subset sum transforms for and and or. This costs
+    O(k * B * 2**B) for k distributions, rather than the product of their
+    sizes. Anything else falls back to combining the outcomes pairwise.
+
+    Every weight that comes back from the exclusive or transform is a multiple
+    of the number of bit patterns, so integer weights are divided exactly.
+    Bitwise operations jump about too much for the error of an approximated
+    distribution to carry over, so any such error leaves the result with no
+    useful bound, which is given as an error of 1.
+    """
+
+    distributions = list(distributions)
+    outcomes = [
+        outcome
+        for distribution in distributions
+        for outcome in distribution.outcomes
+    ]
+    natural = all(
+        isinstance(outcome, numbers.Integral) and outcome >= 0
+        for outcome in outcomes
+    )
+    if natural and func is operator.and_ and scalar is not None and scalar < 0:
+        width = max(outcomes, default=0).bit_length()
+        scalar &= (1 << width) - 1
+
+    outcomes.append(scalar)
+
+    if not natural or not (
+        isinstance(scalar, numbers.Integral) and scalar >= 0
+    ):
+        ret = functools.reduce(
+            functools.partial(combine, func=func),
+            distributions
+        )
+        return transform(ret, lambda outcome: func(outcome, scalar))
+
+    size = 1 << max(outcomes).bit_length()
+    if func is operator.xor:
+        forward = walsh_hadamard
+        backward = walsh_hadamard
+    else:
+        supersets = func is operator.and_
+        forward = functools.partial(subset_sum, supersets=supersets)
+        backward = functools.partial(
+            subset_sum,
+            supersets=supersets,
+            inverse=True
+        )
+
+    total = 1
+    ret = None
+    for distribution in distributions + [point(scalar)]:
+        total *= distribution.total
+        values = [0] * size
+        for outcome, weight in zip(distribution.outcomes, distribution.weights):
+            values[outcome] = weight
+
+        forward(values)
+        if ret is None:
+            ret = values
+        else:
+            ret = [left * right for left, right in zip(ret, values)]
+
+    backward(ret)
+    if func is operator.xor:
+        ret = [
+            value // size
+            if isinstance(value, numbers.Integral)
+            else value / size
+            for value in ret
+        ]
+
+    return Distribution(
+        {
+            outcome: weight
+            for outcome, weight in enumerate(ret)
+            if weight > 0
+        },
+        total,
+        carried_error(*(
+            distribution.error and 1
+            for distribution in distributions
+        ))
+    )
+
+
+def enumerate_dice(distribution, num, func):
+    """
+    The distribution of ``func(values)`` over every sequence of num independent
+    draws from the distribution. This enumerates all of the possible sequences,
+    so it is only suitable for small numbers of dice. Nothing is known of
+    func, so any error of the distribution leaves the result with no useful
+    bound, which is given as an error of 1.
+    """
+
+    weights = collections.defaultdict(int)
+    for rolls in itertools.product(
+        tuple(zip(distribution.outcomes, distribution.weights)),
+        repeat=num
+    ):
+        values, probabilities = zip(*rolls)
+        weights[func(values)] += functools.reduce(operator.mul, probabilities)
+
+    return Distribution(
+        weights,
+        distribution.total ** num,
+        carried_error(distribution.error and 1)
+    )
+
+
+def keep(distribution, num, kept, highest=True):
+    """
+    The distribution of the sum of the highest (or lowest) kept values out of
+    num independent draws from the distribution.
+
+    Rather than enumerating every sequence of rolls, this walks the outcomes
+    from the most to the least favored end, and for each outcome counts how
+    many of the remaining dice show it, using the binomial coefficient for the
+    number of ways to choose those dice. Only the number of dice placed so far
+    and the sum of the kept dice need to be tracked, so the cost is polynomial
+    in the number of dice rather than exponential.
+
+    The kept sum only rises as any one draw does, so any error of the
+    distribution carries over once for every draw.
+    """
+
+    outcomes = zip(distribution.outcomes, distribution.weights)
+    if highest:
+        outcomes = reversed(tuple(outcomes))
+
+    states = {(0, 0): 1}
+    for outcome, weight in outcomes:
+        powers = [weight ** count for count in range(num + 1)]
+        new_states = collections.defaultdict(int)
+        for (placed, total), state_weight in states.items():
+            remaining = num - placed
+            for count in range(remaining + 1):
+                new_states[
+                    (
+                        placed + count,
+                        total + outcome * min(count, max(kept - placed, 0))
+                    )
+                ] += state_weight * math.comb(remaining, count) * powers[count]
+
+        states = new_states
+
+    return Distribution(
+        {
+            total: weight
+            for (placed, total), weight in states.items()
+            if placed == num
+        },
+        distribution.total ** num,
+        carried_error(num * distribution.error)
+    )
+
+
+def contest_row(tables, row):
+    """
+    One row of the matrices built by :py:func:`contest`: the chance that the
+    given distribution beats, and ties, each of the distributions laid out in
+    the tables.
+    """
+
+    positions, weights, total, below, dense = tables[row]
+    wins = []
+    ties = []
+    for other in tables:
+        other_total, other_below, other_dense = other[2:]
+        scale = total * other_total
+        wins.append(true_divide(
+            sum(
+                weight * other_below[position]
+                for position, weight in zip(positions, weights)
+            ),
+            scale
+        ))
+        ties.append(true_divide(
+            sum(
+                weight * other_dense[position]
+                for position, weight in zip(positions, weights)
+            ),
+            scale
+        ))
+
+    return wins, ties
+
+
+def contest(distributions, executor=None):
+    """
+    The chance that a draw from each distribution beats, and ties, a draw from
+    each of the others, as a pair of square matrices (lists of rows).
+
+    All of the distributions are laid out on one shared grid of every outcome
+    any of them can have, along with the running total of their weights below
+    each point of the grid. Each entry then costs one pass over the support of
+    the row's distribution, looking up the column's running totals by grid
+    position rather than searching for them.
+
+    The rows can be spread over a :py:mod:`concurrent.futures` executor. A
+    process pool gets around the global interpreter lock, at the cost of
+    sending the grid to the workers.
+    """
+
+    distributions = list(distributions)
+    grid = sorted(set().union(
+        *(distribution.outcomes for distribution in distributions)
+    ))
+    index = {outcome: position for position, outcome in enumerate(grid)}
+
+    tables = []
+    for distribution in distributions:
+        dense = [0] * len(grid)
+        positions = [index[outcome] for outcome in distribution.outcomes]
+        for position, weight in zip(positions, distribution.weights):
+            dense[position] = weight
+
+        tables.append((
+            positions,
+            distribution.weights,
+            distribution.total,
+            [0] + list(itertools.accumulate(dense)),
+            dense
+        ))
+
+    func = functools.partial(contest_row, tables)
+    rows = range(len(tables))
+    if executor is None:
+        results = list(map(func, rows))
+    else:
+        results = list(executor.map(
+            func,
+            rows,
+            chunksize=max(1, len(tables) // 32)
+        ))
+
+    return (
+        [wins for wins, ties in results],
+        [ties for wins, ties in results]
+    )